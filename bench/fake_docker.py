@@ -0,0 +1,238 @@
+"""Cliente docker-py simulado para os benchmarks
+
+Imita só a parte da API usada pelo bot: listagem (esparsa ou não), inspect,
+stats, eventos e imagens, com N containers sintéticos e latências
+configuráveis por chamada.
+"""
+import hashlib
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import docker
+
+
+def fake_id(seed: str) -> str:
+    return hashlib.sha256(seed.encode()).hexdigest()
+
+
+class FakeContainer:
+    """Container como o docker-py devolve após um inspect"""
+    def __init__(self, client: 'FakeDockerClient', attrs: dict):
+        self.client = client
+        self.attrs = attrs
+
+    @property
+    def id(self) -> str:
+        return self.attrs['Id']
+
+    @property
+    def short_id(self) -> str:
+        return self.id[:12]
+
+    @property
+    def name(self) -> str:
+        return self.attrs['Name'].lstrip('/')
+
+    @property
+    def status(self) -> str:
+        return self.attrs['State']['Status']
+
+    def stats(self, stream: bool = False):
+        time.sleep(self.client.stats_latency)
+        return self.client.raw_stats(self.id)
+
+    def restart(self, timeout: int = 10):
+        time.sleep(self.client.action_latency)
+        self.client.mark_started(self.id)
+
+    def start(self):
+        time.sleep(self.client.action_latency)
+        self.client.mark_started(self.id)
+
+    def stop(self, timeout: int = 10):
+        time.sleep(self.client.action_latency)
+        self.client.set_status(self.id, 'exited')
+
+
+class SparseContainer(FakeContainer):
+    """Container como vem de containers.list(sparse=True): só os campos da listagem"""
+    @property
+    def name(self) -> str:
+        return self.attrs['Names'][0].lstrip('/')
+
+    @property
+    def status(self) -> str:
+        return self.attrs['State']
+
+
+class FakeContainerCollection:
+    def __init__(self, client: 'FakeDockerClient'):
+        self.client = client
+
+    def list(self, all: bool = False, sparse: bool = False, **kwargs):
+        time.sleep(self.client.list_latency)
+        items = [attrs for attrs in list(self.client.containers_by_id.values())
+                 if all or attrs['State']['Status'] == 'running']
+        if sparse:
+            return [SparseContainer(self.client, self.client.list_entry(attrs)) for attrs in items]
+        # Sem sparse o docker-py faz um inspect por container
+        time.sleep(self.client.inspect_latency * len(items))
+        return [FakeContainer(self.client, attrs) for attrs in items]
+
+    def get(self, container_id: str):
+        time.sleep(self.client.inspect_latency)
+        attrs = self.client.containers_by_id.get(container_id) or self.client.containers_by_name.get(container_id)
+        if attrs is None:
+            matches = [a for cid, a in self.client.containers_by_id.items() if cid.startswith(container_id)]
+            if len(matches) != 1:
+                raise docker.errors.NotFound(f"No such container: {container_id}")
+            attrs = matches[0]
+        return FakeContainer(self.client, attrs)
+
+    def prune(self):
+        return {'ContainersDeleted': None, 'SpaceReclaimed': 0}
+
+
+class FakeEventStream:
+    """Equivalente ao CancellableStream: iterador bloqueante encerrado por close()"""
+    def __init__(self):
+        self.queue: 'queue.Queue' = queue.Queue()
+
+    def __iter__(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            yield event
+
+    def emit(self, event: dict):
+        self.queue.put(event)
+
+    def close(self):
+        self.queue.put(None)
+
+
+class FakeAPIClient:
+    def __init__(self, client: 'FakeDockerClient'):
+        self.client = client
+
+    def images(self):
+        time.sleep(self.client.list_latency)
+        return [{'Id': image_id, 'RepoTags': [tag]} for tag, image_id in self.client.images.items()]
+
+    def stats(self, container_id: str, stream: bool = True, decode: bool = True):
+        while container_id in self.client.containers_by_id:
+            time.sleep(max(self.client.stats_latency, 0.5))
+            yield self.client.raw_stats(container_id)
+
+
+class FakeDockerClient:
+    """Daemon com `count` containers sintéticos (~90% rodando)"""
+    def __init__(self, count: int, stats_latency: float = 0.05, inspect_latency: float = 0.002,
+                 list_latency: float = 0.01, action_latency: float = 0.05, seed: int = 42):
+        self.stats_latency = stats_latency
+        self.inspect_latency = inspect_latency
+        self.list_latency = list_latency
+        self.action_latency = action_latency
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.containers = FakeContainerCollection(self)
+        self.api = FakeAPIClient(self)
+        self.streams = []
+        self.images = {f"registry.local/app{i % 20}:latest": f"sha256:{fake_id(f'image{i % 20}')}" for i in range(20)}
+        self.containers_by_id = {}
+        self.containers_by_name = {}
+        for i in range(count):
+            self.add_container(f"svc{i:04d}", running=self.random.random() < 0.9)
+
+    # API do docker-py
+
+    def ping(self):
+        return True
+
+    def events(self, decode: bool = True, filters: dict = None):
+        stream = FakeEventStream()
+        self.streams.append(stream)
+        return stream
+
+    def close(self):
+        for stream in self.streams:
+            stream.close()
+
+    # Simulação
+
+    def add_container(self, name: str, running: bool = True) -> str:
+        container_id = fake_id(name)
+        image = list(self.images)[len(self.containers_by_id) % len(self.images)]
+        now = datetime.now(timezone.utc)
+        attrs = {
+            'Id': container_id,
+            'Name': f"/{name}",
+            'Created': (now - timedelta(days=3)).isoformat(),
+            'Image': self.images[image],
+            'State': {
+                'Status': 'running' if running else 'exited',
+                'StartedAt': (now - timedelta(hours=self.random.randint(1, 72))).isoformat(),
+                'Health': {'Status': 'healthy'} if self.random.random() < 0.3 else None
+            },
+            'Config': {'Image': image, 'Labels': {'com.docker.compose.project': f"stack{len(self.containers_by_id) % 10}"}},
+            'NetworkSettings': {'Ports': {'80/tcp': [{'HostIp': '0.0.0.0', 'HostPort': str(10000 + len(self.containers_by_id))}]}}
+        }
+        with self.lock:
+            self.containers_by_id[container_id] = attrs
+            self.containers_by_name[name] = attrs
+        return container_id
+
+    def list_entry(self, attrs: dict) -> dict:
+        health = (attrs['State'].get('Health') or {}).get('Status')
+        status_text = 'Up 3 hours' if attrs['State']['Status'] == 'running' else 'Exited (0) 2 hours ago'
+        return {
+            'Id': attrs['Id'],
+            'Names': [attrs['Name']],
+            'Image': attrs['Config']['Image'],
+            'ImageID': attrs['Image'],
+            'State': attrs['State']['Status'],
+            'Status': f"{status_text} ({health})" if health else status_text
+        }
+
+    def set_status(self, container_id: str, status: str):
+        self.containers_by_id[container_id]['State']['Status'] = status
+        self.emit(container_id, 'die' if status != 'running' else 'start')
+
+    def mark_started(self, container_id: str):
+        state = self.containers_by_id[container_id]['State']
+        state['Status'] = 'running'
+        state['StartedAt'] = datetime.now(timezone.utc).isoformat()
+        self.emit(container_id, 'start')
+
+    def emit(self, container_id: str, action: str):
+        event = {'Type': 'container', 'Action': action, 'id': container_id,
+                 'Actor': {'ID': container_id}, 'time': int(time.time())}
+        for stream in self.streams:
+            stream.emit(event)
+
+    def churn(self, fraction: float) -> list:
+        """Reinicia ou para uma fração dos containers, como um deploy parcial"""
+        ids = self.random.sample(list(self.containers_by_id), max(1, int(len(self.containers_by_id) * fraction)))
+        for container_id in ids:
+            if self.random.random() < 0.7:
+                self.mark_started(container_id)
+            else:
+                self.set_status(container_id, 'exited')
+        return ids
+
+    def raw_stats(self, container_id: str) -> dict:
+        """Amostra no formato da API /containers/{id}/stats"""
+        rng = self.random
+        system = int(time.time() * 1e9)
+        return {
+            'cpu_stats': {'cpu_usage': {'total_usage': system // 100 + rng.randint(0, 10**8)},
+                          'system_cpu_usage': system, 'online_cpus': 4},
+            'precpu_stats': {'cpu_usage': {'total_usage': system // 100},
+                             'system_cpu_usage': system - 10**9},
+            'memory_stats': {'usage': rng.randint(50, 900) * 1024 * 1024, 'limit': 1024 * 1024 * 1024},
+            'networks': {'eth0': {'rx_bytes': rng.randint(0, 10**9), 'tx_bytes': rng.randint(0, 10**9)}}
+        }
@@ -0,0 +1,68 @@
+"""Servidor local compatível com a API de chat da OpenAI/Groq para os benchmarks"""
+import asyncio
+import json
+import time
+
+from aiohttp import web
+
+
+class FakeGroqServer:
+    """Responde /chat/completions com texto sintético, em streaming (SSE) ou não
+
+    `first_token_latency` simula o tempo até o primeiro token e
+    `token_latency` o intervalo entre os trechos seguintes.
+    """
+    def __init__(self, tokens: int = 120, first_token_latency: float = 0.2, token_latency: float = 0.005):
+        self.tokens = tokens
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.requests = 0
+        self.runner = None
+        self.port = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def words(self):
+        for i in range(self.tokens):
+            yield f"palavra{i} " if i % 15 else f"\nLinha {i // 15}: "
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        payload = await request.json()
+        await asyncio.sleep(self.first_token_latency)
+
+        if not payload.get('stream'):
+            await asyncio.sleep(self.token_latency * self.tokens)
+            return web.json_response({
+                'id': f"bench-{self.requests}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': payload.get('model'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': ''.join(self.words())},
+                             'finish_reason': 'stop'}]
+            })
+
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        for word in self.words():
+            chunk = {'choices': [{'index': 0, 'delta': {'content': word}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await asyncio.sleep(self.token_latency)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def start(self, port: int = 0):
+        app = web.Application()
+        app.router.add_post('/chat/completions', self.chat_completions)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.runner:
+            await self.runner.cleanup()
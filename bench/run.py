@@ -0,0 +1,272 @@
+"""Benchmarks offline do bot com Docker e Groq simulados
+
+Uso (na raiz do repositório):
+
+    python bench/run.py                         # 10/100/1000 containers
+    python bench/run.py --sizes 100 --repeat 10
+    python bench/run.py --json out.json         # salva os resultados
+    python bench/run.py --compare out.json      # falha se algum p50 piorar
+
+Para cada tamanho, mede a latência de cada cenário e quanto o event loop
+ficou bloqueado enquanto ele rodava (o que atrasaria o heartbeat do
+Discord e os demais comandos).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Configuração do bot para o benchmark: sem histórico nem estado em disco, sem streams de
+# stats (as coletas passam pelo caminho de polling) e sem cache da IA
+os.environ.update({
+    'DOCKER_HOSTS': '',
+    'GROQ_API_KEY': 'bench',
+    'DEPLOY_CHANNEL_ID': '0',
+    'METRICS_DB_PATH': '',
+    'STATE_DB_PATH': '',
+    'METRICS_EXPORTER_PORT': '0',
+    'STATS_STREAMING': 'false',
+    'AI_CACHE_TTL': '0',
+    'EVENTS_DEBOUNCE': '0.05',
+    'STREAM_EDIT_INTERVAL': '0.2',
+})
+
+import docker  # noqa: E402
+
+from fake_docker import FakeDockerClient  # noqa: E402
+from fake_groq import FakeGroqServer  # noqa: E402
+
+# O bot cria os clientes com docker.from_env(); aqui ele recebe o daemon simulado da rodada
+current = {'client': FakeDockerClient(0)}
+docker.from_env = lambda **kwargs: current['client']
+
+import bot  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)
+
+
+class LoopLagProbe:
+    """Mede o atraso do event loop agendando um tick a cada `interval`"""
+    def __init__(self, interval: float = 0.001, threshold: float = 0.005):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self.blocked = 0.0
+        self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - expected
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.blocked += lag
+
+    async def __aenter__(self):
+        self.task = asyncio.create_task(self._run())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+class FakeMessage:
+    async def edit(self, **kwargs):
+        pass
+
+
+class FakeContext:
+    """Contexto de comando que só conta os envios"""
+    def __init__(self):
+        self.sent = 0
+        self.guild = None
+        self.author = type('Author', (), {'id': 0, 'name': 'bench', 'guild_permissions': None})()
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+        return FakeMessage()
+
+
+async def measure(name: str, size: int, repeat: int, func, setup=None) -> dict:
+    """Roda `func` `repeat` vezes e resume latência e bloqueio do loop"""
+    latencies, max_lag, blocked = [], 0.0, 0.0
+    for _ in range(repeat):
+        if setup:
+            await setup()
+        async with LoopLagProbe() as probe:
+            started = time.perf_counter()
+            result = func()
+            if asyncio.iscoroutine(result):
+                await result
+            latencies.append(time.perf_counter() - started)
+        max_lag = max(max_lag, probe.max_lag)
+        blocked += probe.blocked
+    latencies.sort()
+    return {
+        'scenario': name,
+        'size': size,
+        'p50': statistics.median(latencies),
+        'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'max': latencies[-1],
+        'max_lag': max_lag,
+        'blocked': blocked / repeat
+    }
+
+
+async def bench_size(size: int, args) -> list:
+    fake = FakeDockerClient(size, stats_latency=args.stats_latency, inspect_latency=args.inspect_latency)
+    current['client'] = fake
+    bot.docker_hosts.clear()
+    host = bot.docker_hosts['bench'] = bot.DockerHost('bench')
+    host.client.connect()
+    host.state.containers.update(await host.docker.get_all_containers_info())
+
+    results = []
+    repeat = args.repeat
+
+    async def churn():
+        fake.churn(0.05)
+
+    async def run(name, func, setup=None, times=repeat):
+        result = await measure(name, size, times, func, setup)
+        results.append(result)
+        print_row(result)
+
+    await run('get_all_containers_info (frio)', lambda: host.docker.get_all_containers_info())
+    await run('get_all_containers_info (incremental)',
+              lambda: host.docker.get_all_containers_info(dict(host.state.containers)),
+              setup=churn)
+
+    # Diff puro, com 5% dos containers reiniciados
+    async def changed_snapshot():
+        snapshot = {cid: dict(info) for cid, info in host.state.containers.items()}
+        for cid in list(snapshot)[::20]:
+            snapshot[cid]['started_at'] = f"bench-{time.perf_counter()}"
+            snapshot[cid]['status'] = 'running'
+        changed['snapshot'] = snapshot
+    changed = {}
+    await run('ContainerState.get_container_changes',
+              lambda: host.state.get_container_changes(changed['snapshot']), setup=changed_snapshot)
+
+    await run('get_detailed_container_info', bot.get_detailed_container_info)
+
+    # Monitoramento: ressincronização completa e lote de eventos pelo stream real
+    async def resync():
+        await host.apply_snapshot(await host.docker.get_all_containers_info())
+    await run('monitor: ressincronização', resync, setup=churn)
+
+    events = bot.DockerEventStream(host.docker)
+    await events.open()
+    batches = events.batches()
+
+    async def apply_batch():
+        fake.churn(0.05)
+        await host.apply_events(await batches.__anext__())
+    await run('monitor: lote de eventos (5%)', apply_batch)
+    events.close()
+
+    # Comandos, como se chamados pelo Discord
+    commands = [
+        ('!status', bot.status, {}),
+        ('!resources', bot.resources, {}),
+        ('!resources svc0001', bot.resources, {'container_name': 'svc0001'}),
+        ('!top', bot.top_resources, {}),
+        ('!system', bot.system_info, {}),
+        ('!deploy_status', bot.deploy_status, {}),
+        ('!restart svc0002', bot.restart_container, {'targets': 'svc0002'}),
+    ]
+    for label, command, kwargs in commands:
+        await run(label, lambda command=command, kwargs=kwargs: command.callback(FakeContext(), **kwargs))
+
+    ai_repeat = max(1, repeat // 2)
+    await run('!ask', lambda: bot.ask_ai.callback(FakeContext(), question='qual container usa mais memória?'), times=ai_repeat)
+    await run('!analyze', lambda: bot.analyze_system.callback(FakeContext()), times=ai_repeat)
+    await run('!explain svc0003', lambda: bot.explain_container.callback(FakeContext(), 'svc0003'), times=ai_repeat)
+
+    host.docker.executor.shutdown(wait=False)
+    host.docker.stats_executor.shutdown(wait=False)
+    return results
+
+
+def format_ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}"
+
+
+def print_header():
+    print(f"{'cenário':<40} {'N':>5} {'p50 ms':>9} {'p95 ms':>9} {'máx ms':>9} {'lag máx ms':>11} {'bloqueio ms':>12}")
+    print('-' * 100)
+
+
+def print_row(result: dict):
+    print(f"{result['scenario']:<40} {result['size']:>5} {format_ms(result['p50']):>9} {format_ms(result['p95']):>9} "
+          f"{format_ms(result['max']):>9} {format_ms(result['max_lag']):>11} {format_ms(result['blocked']):>12}")
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> int:
+    """Compara os p50 com uma execução anterior; retorna quantos pioraram além da tolerância"""
+    with open(baseline_path) as f:
+        baseline = {(r['scenario'], r['size']): r for r in json.load(f)}
+    regressions = 0
+    print(f"\nComparação com {baseline_path} (tolerância {tolerance:.0%}):")
+    for result in results:
+        before = baseline.get((result['scenario'], result['size']))
+        if not before or before['p50'] <= 0:
+            continue
+        ratio = result['p50'] / before['p50']
+        if ratio > 1 + tolerance:
+            regressions += 1
+            print(f"  ❌ {result['scenario']} (N={result['size']}): {format_ms(before['p50'])} → {format_ms(result['p50'])} ms ({ratio:.2f}×)")
+    if not regressions:
+        print("  ✅ Nenhuma regressão")
+    return regressions
+
+
+async def main(args) -> int:
+    groq = FakeGroqServer(tokens=args.tokens, first_token_latency=args.groq_latency)
+    await groq.start()
+    bot.groq_client = bot.GroqClient('bench', base_url=groq.base_url)
+    await bot.groq_client.start()
+
+    results = []
+    print_header()
+    try:
+        for size in args.sizes:
+            results += await bench_size(size, args)
+    finally:
+        await bot.groq_client.close()
+        await groq.close()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='quantidades de containers')
+    parser.add_argument('--repeat', type=int, default=5, help='repetições por cenário')
+    parser.add_argument('--stats-latency', type=float, default=0.02, help='latência (s) de cada container.stats()')
+    parser.add_argument('--inspect-latency', type=float, default=0.002, help='latência (s) de cada inspect')
+    parser.add_argument('--groq-latency', type=float, default=0.2, help='tempo (s) até o primeiro token da IA')
+    parser.add_argument('--tokens', type=int, default=120, help='trechos por resposta da IA')
+    parser.add_argument('--json', help='salva os resultados neste arquivo')
+    parser.add_argument('--compare', help='resultados anteriores (JSON) para detectar regressões')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='piora aceitável do p50 na comparação')
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,16 +1,31 @@
 import os
 import discord
 import docker
+from discord import app_commands
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 import asyncio
 from datetime import datetime, timedelta
 import aiohttp
+from aiohttp import web
 import json
+import re
+import hashlib
+import gzip
+import io
+import shlex
+from collections import OrderedDict, deque
+import sqlite3
 import psutil
 import time
 import logging
-from typing import Dict, List, Optional, Set
+import functools
+import bisect
+import heapq
+from array import array
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -22,30 +37,226 @@ load_dotenv()
 # Configurações
 TOKEN = os.getenv('DISCORD_TOKEN')
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama-3.3-70b-versatile')  # Modelo usado nas respostas da IA
+GROQ_BASE_URL = os.getenv('GROQ_BASE_URL', 'https://api.groq.com/openai/v1')  # URL base da API compatível com OpenAI
+GROQ_MAX_CONNECTIONS = int(os.getenv('GROQ_MAX_CONNECTIONS', 10))  # Conexões simultâneas mantidas com a Groq
+GROQ_TIMEOUT = float(os.getenv('GROQ_TIMEOUT', 60))  # Timeout total (s) por requisição à Groq
+STREAM_EDIT_INTERVAL = float(os.getenv('STREAM_EDIT_INTERVAL', 1.0))  # Intervalo mínimo (s) entre edições de uma resposta em streaming
+AI_CACHE_TTL = float(os.getenv('AI_CACHE_TTL', 300))  # Validade (s) de uma resposta da IA em cache (0 desativa)
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', 256))  # Respostas da IA mantidas em cache
+AI_CONTEXT_TOKEN_BUDGET = int(os.getenv('AI_CONTEXT_TOKEN_BUDGET', 3000))  # Tokens (estimados) de contexto enviados à IA
 DEPLOY_CHANNEL_ID = int(os.getenv('DEPLOY_CHANNEL_ID', 0))  # ID do canal para notificações de deploy
+DOCKER_HOSTS = os.getenv('DOCKER_HOSTS', '')  # Daemons monitorados: nome=url separados por vírgula (vazio usa o ambiente local)
+DOCKER_EXECUTOR_WORKERS = int(os.getenv('DOCKER_EXECUTOR_WORKERS', 8))  # Threads para chamadas ao Docker
+DOCKER_CALL_TIMEOUT = float(os.getenv('DOCKER_CALL_TIMEOUT', 30))  # Timeout padrão (s) por chamada ao Docker
+DOCKER_STOP_TIMEOUT = int(os.getenv('DOCKER_STOP_TIMEOUT', 10))  # Tempo (s) que o Docker espera antes do SIGKILL
+STATS_CONCURRENCY = int(os.getenv('STATS_CONCURRENCY', 10))  # Coletas de stats simultâneas
+STATS_DEADLINE = float(os.getenv('STATS_DEADLINE', 5))  # Prazo (s) por container antes de marcar stats como desatualizadas
+STATS_STREAMING = os.getenv('STATS_STREAMING', 'true').lower() in ('1', 'true', 'yes')  # Manter streams de stats abertos em segundo plano
+STATS_STREAM_MAX = int(os.getenv('STATS_STREAM_MAX', 100))  # Máximo de streams de stats simultâneos
+STATS_CACHE_MAX_AGE = float(os.getenv('STATS_CACHE_MAX_AGE', 10))  # Idade máxima (s) de uma amostra em cache
+EVENTS_DEBOUNCE = float(os.getenv('EVENTS_DEBOUNCE', 0.5))  # Janela (s) para agrupar eventos do Docker do mesmo lote
+EVENTS_RECONNECT_DELAY = float(os.getenv('EVENTS_RECONNECT_DELAY', 5))  # Espera (s) antes de reconectar ao stream de eventos
+NOTIFY_DEBOUNCE = float(os.getenv('NOTIFY_DEBOUNCE', 3))  # Janela (s) para juntar mudanças em uma única notificação
+NOTIFY_RATE_LIMIT = int(os.getenv('NOTIFY_RATE_LIMIT', 5))  # Mensagens por canal a cada 5 s (limite do Discord)
+FLAP_WINDOW = float(os.getenv('FLAP_WINDOW', 300))  # Janela (s) de contagem de reinícios por container
+FLAP_THRESHOLD = int(os.getenv('FLAP_THRESHOLD', 4))  # Reinícios na janela para considerar o container em loop
+FLAP_STABLE_AFTER = float(os.getenv('FLAP_STABLE_AFTER', FLAP_WINDOW))  # Tempo (s) sem reinícios para considerá-lo estável
+ALERT_RULES = os.getenv('ALERT_RULES', '*.cpu>90:5m,*.mem_pct>95,host.cpu>90:5m,host.mem_pct>95,host.disk_pct>85')  # Regras de alerta (vazio desativa)
+ALERT_INTERVAL = float(os.getenv('ALERT_INTERVAL', 15))  # Intervalo (s) de avaliação das regras de alerta
+ALERT_HYSTERESIS = float(os.getenv('ALERT_HYSTERESIS', 0.1))  # Fração do limite que o valor precisa recuar para resolver o alerta
+ALERT_COOLDOWN = float(os.getenv('ALERT_COOLDOWN', 1800))  # Tempo (s) mínimo entre notificações da mesma regra e série
+ALERT_EWMA_ALPHA = float(os.getenv('ALERT_EWMA_ALPHA', 0.05))  # Peso de cada amostra na linha de base das regras de anomalia
+ALERT_ANOMALY_WARMUP = int(os.getenv('ALERT_ANOMALY_WARMUP', 40))  # Amostras antes de uma regra de anomalia começar a avaliar
+METRICS_EXPORTER_PORT = int(os.getenv('METRICS_EXPORTER_PORT', 0))  # Porta do endpoint /metrics (0 desativa)
+METRICS_EXPORTER_BIND = os.getenv('METRICS_EXPORTER_BIND', '0.0.0.0')  # Endereço em que o endpoint /metrics escuta
+HOST_SAMPLE_INTERVAL = float(os.getenv('HOST_SAMPLE_INTERVAL', 5))  # Intervalo (s) entre amostras de métricas do host
+METRICS_DB_PATH = os.getenv('METRICS_DB_PATH', 'data/metrics.db')  # Banco SQLite do histórico de métricas (vazio desativa)
+STATE_DB_PATH = os.getenv('STATE_DB_PATH', 'data/state.db')  # Banco SQLite com configuração, último snapshot e histórico (vazio desativa)
+STATE_FLUSH_INTERVAL = float(os.getenv('STATE_FLUSH_INTERVAL', 10))  # Intervalo (s) entre gravações do estado
+STATE_HISTORY_DAYS = float(os.getenv('STATE_HISTORY_DAYS', 30))  # Retenção do histórico de notificações e alertas
+METRICS_RECORD_INTERVAL = float(os.getenv('METRICS_RECORD_INTERVAL', 15))  # Intervalo (s) entre gravações de métricas
+METRICS_RAW_RETENTION_HOURS = float(os.getenv('METRICS_RAW_RETENTION_HOURS', 24))  # Retenção das amostras brutas
+METRICS_1M_RETENTION_DAYS = float(os.getenv('METRICS_1M_RETENTION_DAYS', 7))  # Retenção dos agregados por minuto
+METRICS_1H_RETENTION_DAYS = float(os.getenv('METRICS_1H_RETENTION_DAYS', 90))  # Retenção dos agregados por hora
+RING_BUFFER_INTERVAL = float(os.getenv('RING_BUFFER_INTERVAL', 5))  # Intervalo (s) entre amostras mantidas em memória
+RING_BUFFER_HOURS = float(os.getenv('RING_BUFFER_HOURS', 3))  # Janela (h) de amostras recentes mantidas em memória
+SLASH_COMMANDS = os.getenv('SLASH_COMMANDS', 'true').lower() in ('1', 'true', 'yes')  # Registrar os comandos também como slash (/)
+SLASH_GUILD_ID = int(os.getenv('SLASH_GUILD_ID', 0))  # Servidor para registro imediato dos slash commands (0 = global)
+DASHBOARD_PAGE_SIZE = int(os.getenv('DASHBOARD_PAGE_SIZE', 15))  # Containers por página do !dashboard
+DASHBOARD_REFRESH_INTERVAL = float(os.getenv('DASHBOARD_REFRESH_INTERVAL', 30))  # Intervalo (s) de atualização dos painéis
+DASHBOARD_MAX = int(os.getenv('DASHBOARD_MAX', 5))  # Painéis ativos ao mesmo tempo (o mais antigo é encerrado)
+BULK_CONCURRENCY = int(os.getenv('BULK_CONCURRENCY', 4))  # Ações simultâneas em !restart/!start/!stop com vários containers
+LOGS_DEFAULT_TAIL = int(os.getenv('LOGS_DEFAULT_TAIL', 100))  # Linhas mostradas pelo !logs sem --tail
+LOGS_MAX_LINES = int(os.getenv('LOGS_MAX_LINES', 20000))  # Máximo de linhas guardadas por leitura de logs
+LOGS_MAX_BYTES = int(os.getenv('LOGS_MAX_BYTES', 4 * 1024 * 1024))  # Máximo de bytes guardados por leitura de logs
+LOGS_SCAN_LIMIT = int(os.getenv('LOGS_SCAN_LIMIT', 512 * 1024 * 1024))  # Bytes lidos do Docker antes de interromper uma busca
+LOGS_TIMEOUT = float(os.getenv('LOGS_TIMEOUT', 30))  # Tempo (s) máximo de leitura de logs por comando
+LOGS_INLINE_PAGES = int(os.getenv('LOGS_INLINE_PAGES', 3))  # Mensagens de logs antes de enviar como arquivo .gz
+LOGS_FOLLOW_INTERVAL = float(os.getenv('LOGS_FOLLOW_INTERVAL', 3))  # Intervalo (s) entre edições do !logs --follow
+LOGS_FOLLOW_MAX = float(os.getenv('LOGS_FOLLOW_MAX', 600))  # Duração (s) máxima do !logs --follow
 
 # Configurar intents
 intents = discord.Intents.default()
 intents.message_content = True
 
+class LatencyHistogram:
+    """Histograma de latência no estilo HDR, em microssegundos
+
+    Buckets log-lineares: 32 subdivisões por potência de 2 (erro relativo
+    de ~3%), em um array fixo de contadores. Registrar é O(1), sem alocação.
+    """
+    SUB_BUCKETS = 32
+    MAX_SHIFT = 31
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * self.SUB_BUCKETS * (self.MAX_SHIFT + 2)))
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - 6
+        if shift <= 0:
+            return value
+        shift = min(shift, self.MAX_SHIFT)
+        return shift * self.SUB_BUCKETS + min(value >> shift, 2 * self.SUB_BUCKETS - 1)
+
+    def _value(self, index: int) -> int:
+        """Valor médio do bucket"""
+        if index < 2 * self.SUB_BUCKETS:
+            return index
+        shift = index // self.SUB_BUCKETS - 1
+        return ((index - shift * self.SUB_BUCKETS) << shift) + (1 << shift) // 2
+
+    def record(self, seconds: float):
+        value = max(int(seconds * 1_000_000), 0)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Percentil q (0-100) em segundos"""
+        if not self.total:
+            return 0.0
+        target = max(1, int(self.total * q / 100 + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._value(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+class PerfTimer:
+    """Context manager que mede um trecho e registra no histograma"""
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.started)
+        return False
+
+class PerfRegistry:
+    """Histogramas de latência do próprio bot, por categoria e nome"""
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+
+    def histogram(self, kind: str, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get((kind, name))
+        if histogram is None:
+            histogram = self.histograms[(kind, name)] = LatencyHistogram()
+        return histogram
+
+    def timer(self, kind: str, name: str) -> PerfTimer:
+        return PerfTimer(self.histogram(kind, name))
+
+    def record(self, kind: str, name: str, seconds: float):
+        self.histogram(kind, name).record(seconds)
+
+perf = PerfRegistry()
+
+class InstrumentedContext(commands.Context):
+    """Contexto de comando que mede o tempo de cada envio ao Discord"""
+    async def send(self, *args, **kwargs):
+        with perf.timer('discord', 'ctx.send'):
+            return await super().send(*args, **kwargs)
+
+class HomelabBot(commands.Bot):
+    """Bot com ganchos de inicialização e encerramento dos clientes compartilhados"""
+    async def get_context(self, origin, /, *, cls=InstrumentedContext):
+        return await super().get_context(origin, cls=cls)
+
+    async def setup_hook(self):
+        if state_store:
+            await state_store.load()
+        if groq_client:
+            await groq_client.start()
+        if metrics_exporter:
+            await metrics_exporter.start()
+        if SLASH_COMMANDS:
+            await self.sync_app_commands()
+
+    async def sync_app_commands(self):
+        """Registra os slash commands; num servidor específico aparecem na hora, globais podem levar até 1h"""
+        try:
+            if SLASH_GUILD_ID:
+                guild = discord.Object(id=SLASH_GUILD_ID)
+                self.tree.copy_global_to(guild=guild)
+                synced = await self.tree.sync(guild=guild)
+            else:
+                synced = await self.tree.sync()
+            logger.info(f"{len(synced)} slash commands registrados")
+        except discord.HTTPException as e:
+            logger.error(f"Erro ao registrar slash commands: {e}")
+
+    async def close(self):
+        if groq_client:
+            await groq_client.close()
+        if metrics_exporter:
+            await metrics_exporter.close()
+        for host in docker_hosts.values():
+            host.close()
+        # Gravação final e só então o fechamento dos bancos
+        if metrics_store:
+            await metrics_store.flush()
+            metrics_store.close()
+        if state_store:
+            await state_store.flush()
+            state_store.close()
+        await super().close()
+
 # Criar instância do bot
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = HomelabBot(command_prefix='!', intents=intents)
 
-# Cliente Docker
-print("🔧 Inicializando cliente Docker...")
-try:
-    docker_client = docker.from_env()
-    docker_client.ping()
-    print("✅ Cliente Docker conectado com sucesso!")
-except Exception as e:
-    print(f"❌ Erro ao conectar Docker: {e}")
-    docker_client = None
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.perf_started = time.perf_counter()
+    # Slash commands precisam de resposta em 3 s: adia e responde depois por follow-up
+    if ctx.interaction and not ctx.interaction.response.is_done():
+        await ctx.defer()
+
+@bot.after_invoke
+async def record_command_time(ctx):
+    """Registra a duração de cada comando (também dos que falham)"""
+    started = getattr(ctx, 'perf_started', None)
+    if started is not None:
+        perf.record('command', ctx.command.qualified_name, time.perf_counter() - started)
 
 class ContainerState:
     """Classe para armazenar estado dos containers"""
     def __init__(self):
         self.containers: Dict[str, dict] = {}
         self.last_update = datetime.now()
+        # True enquanto o stream de eventos do Docker mantém o estado atualizado
+        self.live = False
+        # Inícios recentes por container (janela deslizante) e containers em loop de reinício
+        self.starts: Dict[str, deque] = {}
+        self.flapping: Dict[str, dict] = {}
     
     def update_container(self, container_id: str, container_info: dict):
         """Atualiza informações de um container"""
@@ -58,14 +269,45 @@ class ContainerState:
             del self.containers[container_id]
             self.last_update = datetime.now()
     
+    def record_start(self, container_id: str, now: float) -> int:
+        """Registra um início do container e retorna quantos houve dentro da janela"""
+        starts = self.starts.setdefault(container_id, deque())
+        starts.append(now)
+        while starts[0] < now - FLAP_WINDOW:
+            starts.popleft()
+        return len(starts)
+
+    def check_stability(self, now: Optional[float] = None) -> List[dict]:
+        """Tira do estado de loop os containers sem reinícios há FLAP_STABLE_AFTER segundos"""
+        now = now if now is not None else time.monotonic()
+        stabilized = []
+        for container_id, flap in list(self.flapping.items()):
+            if now - self.starts[container_id][-1] >= FLAP_STABLE_AFTER:
+                del self.flapping[container_id]
+                stabilized.append({
+                    'container': self.containers.get(container_id, flap['container']),
+                    'count': flap['count'],
+                    'duration': now - flap['since']
+                })
+        return stabilized
+
     def get_container_changes(self, new_containers: Dict[str, dict]) -> Dict[str, List]:
-        """Detecta mudanças nos containers"""
+        """Detecta mudanças nos containers
+
+        Um container que reinicia FLAP_THRESHOLD vezes dentro de FLAP_WINDOW é
+        reportado uma vez em 'flapping'; suas mudanças seguintes são suprimidas
+        até ficar estável, quando aparece em 'stabilized'.
+        """
         changes = {
             'created': [],
             'removed': [],
             'restarted': [],
-            'status_changed': []
+            'status_changed': [],
+            'health_changed': [],
+            'flapping': [],
+            'stabilized': []
         }
+        now = time.monotonic()
         
         current_ids = set(self.containers.keys())
         new_ids = set(new_containers.keys())
@@ -77,6 +319,8 @@ class ContainerState:
         # Containers removidos
         for container_id in current_ids - new_ids:
             changes['removed'].append(self.containers[container_id])
+            self.starts.pop(container_id, None)
+            self.flapping.pop(container_id, None)
         
         # Containers com mudanças de estado
         for container_id in current_ids & new_ids:
@@ -86,8 +330,23 @@ class ContainerState:
             # Verificar se foi reiniciado (comparar timestamps de criação)
             old_started = old_info.get('started_at')
             new_started = new_info.get('started_at')
+            started = new_info['status'] == 'running' and (old_started != new_started or old_info['status'] != 'running')
             
-            if old_started != new_started and new_info['status'] == 'running':
+            # Contar reinícios e suprimir o ruído de containers em loop
+            if started:
+                count = self.record_start(container_id, now)
+                if container_id in self.flapping:
+                    self.flapping[container_id]['count'] += 1
+                elif count >= FLAP_THRESHOLD:
+                    self.flapping[container_id] = {'container': new_info, 'since': self.starts[container_id][0], 'count': count}
+                    changes['flapping'].append({'container': new_info, 'count': count, 'window': FLAP_WINDOW})
+            if container_id in self.flapping:
+                continue
+            
+            # Primeiro start de um container recém-criado (create e start em lotes diferentes)
+            # não é reinício: StartedAt ainda estava zerado
+            first_start = old_info['status'] == 'created' or not old_started or old_started.startswith('0001-01-01')
+            if old_started != new_started and new_info['status'] == 'running' and not first_start:
                 changes['restarted'].append(new_info)
             
             # Verificar mudança de status
@@ -97,23 +356,48 @@ class ContainerState:
                     'old_status': old_info['status'],
                     'new_status': new_info['status']
                 })
+            
+            # Verificar entrada ou saída do estado unhealthy
+            old_health = old_info.get('health')
+            new_health = new_info.get('health')
+            if old_health != new_health and 'unhealthy' in (old_health, new_health):
+                changes['health_changed'].append({
+                    'container': new_info,
+                    'old_health': old_health,
+                    'new_health': new_health
+                })
         
+        changes['stabilized'] = self.check_stability(now)
         return changes
 
-# Estado global dos containers
-container_state = ContainerState()
-
 class GroqClient:
-    """Cliente para API Groq"""
-    def __init__(self, api_key: str):
+    """Cliente para API Groq
+
+    Mantém uma única ClientSession (keep-alive, cache de DNS) criada no
+    setup do bot e fechada no encerramento, em vez de pagar DNS + TCP + TLS
+    a cada pergunta.
+    """
+    def __init__(self, api_key: str, base_url: str = GROQ_BASE_URL):
         self.api_key = api_key
-        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.base_url = f"{base_url.rstrip('/')}/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self.session: Optional[aiohttp.ClientSession] = None
     
-    async def chat_completion(self, messages: list, model: str = "llama-3.3-70b-versatile", max_tokens: int = 1000):
+    async def start(self):
+        """Cria a sessão compartilhada (precisa de um event loop rodando)"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=GROQ_MAX_CONNECTIONS, ttl_dns_cache=300, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=GROQ_TIMEOUT))
+        return self.session
+    
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+    
+    async def chat_completion(self, messages: list, model: str = GROQ_MODEL, max_tokens: int = 1000):
         """Faz uma requisição para o modelo de chat da Groq"""
         payload = {
             "messages": messages,
@@ -123,8 +407,9 @@ class GroqClient:
             "stream": False
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
+        session = await self.start()
+        try:
+            with perf.timer('groq', 'chat_completion'):
                 async with session.post(self.base_url, headers=self.headers, json=payload) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -132,8 +417,108 @@ class GroqClient:
                     else:
                         error_text = await response.text()
                         return f"Erro na API Groq: {response.status} - {error_text}"
-            except Exception as e:
-                return f"Erro de conexão com Groq: {str(e)}"
+        except Exception as e:
+            return f"Erro de conexão com Groq: {str(e)}"
+    
+    async def stream_chat_completion(self, messages: list, model: str = GROQ_MODEL, max_tokens: int = 1000):
+        """Gera os trechos de texto da resposta conforme chegam (SSE)"""
+        payload = {
+            "messages": messages,
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": 0.7,
+            "stream": True
+        }
+        
+        session = await self.start()
+        started = time.perf_counter()
+        first_token = True
+        try:
+            with perf.timer('groq', 'stream_chat_completion'):
+                async with session.post(self.base_url, headers=self.headers, json=payload) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        yield f"Erro na API Groq: {response.status} - {error_text}"
+                        return
+                    
+                    async for line in response.content:
+                        line = line.strip()
+                        if not line.startswith(b"data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == b"[DONE]":
+                            return
+                        delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                        if delta:
+                            if first_token:
+                                perf.record('groq', 'first_token', time.perf_counter() - started)
+                                first_token = False
+                            yield delta
+        except Exception as e:
+            yield f"\n\nErro de conexão com Groq: {str(e)}"
+
+def is_groq_error(text: str) -> bool:
+    """Indica se o texto é uma das mensagens de erro devolvidas pelo GroqClient"""
+    return text.startswith("Erro na API Groq") or "Erro de conexão com Groq" in text
+
+class AIResponseCache:
+    """Cache TTL + LRU de respostas da IA
+
+    A chave é um hash do modelo, do prompt de sistema e de um retrato
+    arredondado do estado dos containers: pequenas oscilações de CPU/RAM não
+    invalidam a resposta, mudanças reais sim.
+    """
+    def __init__(self, max_entries: int = AI_CACHE_MAX_ENTRIES, ttl: float = AI_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    @staticmethod
+    def key(*parts) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Resposta em cache e sua idade em segundos, se ainda válida"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1], age
+
+    def put(self, key: str, text: str):
+        if self.ttl <= 0 or is_groq_error(text):
+            return
+        self.entries[key] = (time.monotonic(), text)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+ai_cache = AIResponseCache()
+
+def round_to(value: float, step: float) -> float:
+    return round(value / step) * step
+
+def stats_fingerprint(stats: dict) -> tuple:
+    """Stats arredondadas: CPU e RAM % em passos de 5, RAM absoluta em 2 algarismos significativos"""
+    memory = stats.get('memory_usage_mb', 0)
+    return (
+        stats.get('status'),
+        round_to(stats.get('cpu_percent', 0), 5),
+        float(f"{memory:.2g}") if memory else 0,
+        round_to(stats.get('memory_percent', 0), 5)
+    )
+
+def state_fingerprint(containers: List[dict], system_stats: Optional[dict] = None) -> list:
+    """Retrato normalizado dos containers (e do host) usado nas chaves do cache da IA"""
+    fingerprint = sorted((c.get('host'), c['name'], c['status'], c['image'], stats_fingerprint(c['stats'])) for c in containers)
+    if system_stats and 'error' not in system_stats:
+        fingerprint.append(('host', round_to(system_stats['cpu_percent'], 5),
+                            round_to(system_stats['memory'].percent, 5), round(system_stats['disk'].percent)))
+    return fingerprint
 
 # Inicializar cliente Groq
 groq_client = None
@@ -155,17 +540,58 @@ def bytes_to_gb(bytes_value):
         return 0
     return round(bytes_value / 1024 / 1024 / 1024, 2)
 
-def get_container_info(container) -> dict:
+class ImageIndex:
+    """Índice id da imagem -> tags, preenchido por um único images.list()
+
+    container.image no docker-py faz um images.get por container; aqui o nome
+    sai de attrs['Image'] sem chamadas extras. O índice é recarregado quando o
+    stream de eventos reporta pull/tag/untag/delete de imagens.
+    """
+    def __init__(self, client):
+        self.client = client
+        self.tags: Dict[str, List[str]] = {}
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Recarrega o índice (bloqueante: rodar fora do event loop)"""
+        images = self.client.api.images()
+        with self.lock:
+            self.tags = {
+                image['Id']: [tag for tag in (image.get('RepoTags') or []) if tag != '<none>:<none>']
+                for image in images
+            }
+            self.loaded = True
+
+    def resolve(self, image_id: str, fallback: str) -> str:
+        """Primeira tag da imagem, ou o nome usado na criação do container"""
+        if not self.loaded:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Erro ao carregar índice de imagens: {e}")
+                return fallback
+        tags = self.tags.get(image_id)
+        return tags[0] if tags else fallback
+
+def resolve_image_name(attrs: dict, images: Optional[ImageIndex] = None) -> str:
+    """Nome da imagem de um container a partir do inspect, sem consultar o daemon"""
+    fallback = attrs['Config']['Image']
+    return images.resolve(attrs['Image'], fallback) if images else fallback
+
+def get_container_info(container, images: Optional[ImageIndex] = None, host: Optional[str] = None) -> dict:
     """Obtém informações básicas de um container"""
     try:
         attrs = container.attrs
         return {
+            'host': host,
             'id': container.id[:12],
             'name': container.name,
-            'image': container.image.tags[0] if container.image.tags else attrs['Config']['Image'],
+            'image': resolve_image_name(attrs, images),
             'status': container.status,
             'created_at': attrs['Created'],
             'started_at': attrs['State'].get('StartedAt', ''),
+            'health': (attrs['State'].get('Health') or {}).get('Status'),
             'ports': attrs['NetworkSettings'].get('Ports', {}),
             'labels': attrs['Config'].get('Labels', {}),
             'full_id': container.id
@@ -174,69 +600,60 @@ def get_container_info(container) -> dict:
         logger.error(f"Erro ao obter info do container {container.name}: {e}")
         return {}
 
-def get_all_containers_info() -> Dict[str, dict]:
-    """Obtém informações de todos os containers"""
-    if not docker_client:
-        return {}
+def sparse_health(status_text: str) -> Optional[str]:
+    """Saúde do container a partir do texto de status da listagem ('Up 5 minutes (healthy)')"""
+    for health in ('unhealthy', 'healthy', 'health: starting'):
+        if f"({health})" in status_text:
+            return 'starting' if health == 'health: starting' else health
+    return None
+
+def get_all_containers_info(client, previous: Optional[Dict[str, dict]] = None, images: Optional[ImageIndex] = None,
+                            host: Optional[str] = None) -> Dict[str, dict]:
+    """Obtém informações de todos os containers
+
+    Usa a listagem esparsa (sem inspect) e só faz o inspect completo dos
+    containers novos ou cujo estado/saúde mudou em relação a `previous`; os
+    demais reaproveitam a informação já conhecida. Erros propagam: um {} aqui
+    seria interpretado como "todos removidos".
+    """
+    previous = previous or {}
+    containers_info = {}
     
-    try:
-        containers = docker_client.containers.list(all=True)
-        containers_info = {}
-        
-        for container in containers:
-            info = get_container_info(container)
-            if info:
-                containers_info[container.id] = info
+    for container in client.containers.list(all=True, sparse=True):
+        attrs = container.attrs
+        known = previous.get(container.id)
+        if known and known['status'] == attrs.get('State') and known.get('health') == sparse_health(attrs.get('Status', '')):
+            containers_info[container.id] = known
+            continue
         
-        return containers_info
-    except Exception as e:
-        logger.error(f"Erro ao obter containers: {e}")
-        return {}
+        try:
+            info = get_container_info(client.containers.get(container.id), images, host)
+        except docker.errors.NotFound:
+            continue  # Removido entre a listagem e o inspect
+        if info:
+            containers_info[container.id] = info
+    
+    return containers_info
+
+def idle_container_stats(status: str) -> dict:
+    """Stats zeradas de um container que não está rodando"""
+    return {
+        'cpu_percent': 0,
+        'memory_usage_mb': 0,
+        'memory_limit_mb': 0,
+        'memory_percent': 0,
+        'network_rx_mb': 0,
+        'network_tx_mb': 0,
+        'status': status
+    }
 
 def get_container_stats(container):
     """Obtém estatísticas de recursos de um container"""
     try:
         if container.status != 'running':
-            return {
-                'cpu_percent': 0,
-                'memory_usage_mb': 0,
-                'memory_limit_mb': 0,
-                'memory_percent': 0,
-                'network_rx_mb': 0,
-                'network_tx_mb': 0,
-                'status': container.status
-            }
+            return idle_container_stats(container.status)
         
-        stats = container.stats(stream=False)
-        
-        # CPU
-        cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - stats['precpu_stats']['cpu_usage']['total_usage']
-        system_delta = stats['cpu_stats']['system_cpu_usage'] - stats['precpu_stats']['system_cpu_usage']
-        cpu_count = stats['cpu_stats'].get('online_cpus', len(stats['cpu_stats']['cpu_usage'].get('percpu_usage', [1])))
-        
-        cpu_percent = 0
-        if system_delta > 0 and cpu_delta > 0:
-            cpu_percent = (cpu_delta / system_delta) * cpu_count * 100
-        
-        # Memória
-        memory_usage = stats['memory_stats'].get('usage', 0)
-        memory_limit = stats['memory_stats'].get('limit', 0)
-        memory_percent = (memory_usage / memory_limit * 100) if memory_limit > 0 else 0
-        
-        # Rede
-        network_stats = stats.get('networks', {})
-        total_rx = sum(net.get('rx_bytes', 0) for net in network_stats.values())
-        total_tx = sum(net.get('tx_bytes', 0) for net in network_stats.values())
-        
-        return {
-            'cpu_percent': round(cpu_percent, 2),
-            'memory_usage_mb': bytes_to_mb(memory_usage),
-            'memory_limit_mb': bytes_to_mb(memory_limit),
-            'memory_percent': round(memory_percent, 2),
-            'network_rx_mb': bytes_to_mb(total_rx),
-            'network_tx_mb': bytes_to_mb(total_tx),
-            'status': 'running'
-        }
+        return parse_container_stats(container.stats(stream=False))
         
     except Exception as e:
         logger.error(f"Erro ao obter stats do container {container.name}: {e}")
@@ -251,58 +668,803 @@ def get_container_stats(container):
             'error': str(e)
         }
 
-def get_system_stats():
-    """Obtém estatísticas do sistema host"""
-    try:
+def parse_container_stats(stats: dict) -> dict:
+    """Converte uma amostra bruta da API de stats do Docker no formato usado pelo bot"""
+    # CPU
+    cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - stats['precpu_stats']['cpu_usage'].get('total_usage', 0)
+    system_delta = stats['cpu_stats'].get('system_cpu_usage', 0) - stats['precpu_stats'].get('system_cpu_usage', 0)
+    cpu_count = stats['cpu_stats'].get('online_cpus', len(stats['cpu_stats']['cpu_usage'].get('percpu_usage', [1])))
+    
+    cpu_percent = 0
+    if system_delta > 0 and cpu_delta > 0:
+        cpu_percent = (cpu_delta / system_delta) * cpu_count * 100
+    
+    # Memória
+    memory_usage = stats['memory_stats'].get('usage', 0)
+    memory_limit = stats['memory_stats'].get('limit', 0)
+    memory_percent = (memory_usage / memory_limit * 100) if memory_limit > 0 else 0
+    
+    # Rede
+    network_stats = stats.get('networks', {})
+    total_rx = sum(net.get('rx_bytes', 0) for net in network_stats.values())
+    total_tx = sum(net.get('tx_bytes', 0) for net in network_stats.values())
+    
+    return {
+        'cpu_percent': round(cpu_percent, 2),
+        'memory_usage_mb': bytes_to_mb(memory_usage),
+        'memory_limit_mb': bytes_to_mb(memory_limit),
+        'memory_percent': round(memory_percent, 2),
+        'network_rx_mb': bytes_to_mb(total_rx),
+        'network_tx_mb': bytes_to_mb(total_tx),
+        'status': 'running'
+    }
+
+def stale_container_stats() -> dict:
+    """Stats vazias para um container que não respondeu dentro do prazo"""
+    return {
+        'cpu_percent': 0,
+        'memory_usage_mb': 0,
+        'memory_limit_mb': 0,
+        'memory_percent': 0,
+        'network_rx_mb': 0,
+        'network_tx_mb': 0,
+        'status': 'stale',
+        'stale': True
+    }
+
+def stale_marker(stats: dict) -> str:
+    """Marcador exibido ao lado de stats desatualizadas"""
+    return " ⏳" if stats.get('stale') else ""
+
+def format_stats_line(stats: dict) -> str:
+    """Linha de CPU/RAM usada nas listagens de containers"""
+    if stats.get('stale'):
+        return "   ⏳ Stats indisponíveis (prazo esgotado)\n"
+    return f"   CPU: {stats['cpu_percent']}% | RAM: {stats['memory_usage_mb']}MB ({stats['memory_percent']:.1f}%)\n"
+
+def fit_field(entries: List[str], limit: int = 1024, hint: str = "veja `!dashboard`") -> str:
+    """Junta as entradas até o limite de um campo de embed, indicando quantas ficaram de fora"""
+    if sum(len(entry) for entry in entries) <= limit:
+        return "".join(entries)
+    text = ""
+    for index, entry in enumerate(entries):
+        rest = f"… e mais {len(entries) - index} ({hint})"
+        if len(text) + len(entry) + len(rest) > limit:
+            return text + rest
+        text += entry
+    return text
+
+class HostMetricsSampler:
+    """Amostra métricas do host em uma cadência fixa
+
+    psutil.cpu_percent(interval=None) mede desde a chamada anterior, então não
+    dorme; os comandos só leem a última amostra já calculada.
+    """
+    def __init__(self):
+        self.latest: Optional[dict] = None
+        self._last_net = None
+        self._last_net_time = None
+        # Primeira chamada só estabelece a referência do cálculo de CPU
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None, percpu=True)
+
+    def sample(self) -> dict:
+        """Coleta uma amostra completa (bloqueante: rodar fora do event loop)"""
+        try:
+            now = time.monotonic()
+            net = psutil.net_io_counters()
+            net_rates = {'rx_bytes_per_s': 0.0, 'tx_bytes_per_s': 0.0}
+            if self._last_net is not None and now > self._last_net_time:
+                elapsed = now - self._last_net_time
+                net_rates = {
+                    'rx_bytes_per_s': max(net.bytes_recv - self._last_net.bytes_recv, 0) / elapsed,
+                    'tx_bytes_per_s': max(net.bytes_sent - self._last_net.bytes_sent, 0) / elapsed
+                }
+            self._last_net, self._last_net_time = net, now
+
+            self.latest = {
+                'cpu_percent': psutil.cpu_percent(interval=None),
+                'cpu_per_core': psutil.cpu_percent(interval=None, percpu=True),
+                'memory': psutil.virtual_memory(),
+                'swap': psutil.swap_memory(),
+                'load_avg': psutil.getloadavg(),
+                'disk': psutil.disk_usage('/'),
+                'net': net,
+                'net_rates': net_rates,
+                'uptime': time.time() - psutil.boot_time(),
+                'sampled_at': datetime.now()
+            }
+        except Exception as e:
+            logger.error(f"Erro ao amostrar métricas do host: {e}")
+            if self.latest is None:
+                return {'error': str(e)}
+        return self.latest
+
+host_sampler = HostMetricsSampler()
+
+class MetricsStore:
+    """Histórico de métricas em SQLite (modo WAL)
+
+    Cada amostra bruta também é somada, no mesmo INSERT, aos agregados de 1
+    minuto e 1 hora, então consultas longas leem poucas linhas já resumidas.
+    Todo acesso ao banco passa por uma única thread dedicada.
+    """
+    ROLLUPS = (('samples_1m', 60), ('samples_1h', 3600))
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pending: List[Tuple[str, str, int, float]] = []
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='metrics-db')
+        self.conn = None
+        self.last_prune = 0.0
+
+    def _connect(self):
+        if self.conn is not None:
+            return self.conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS samples_raw (
+            series TEXT NOT NULL, metric TEXT NOT NULL, ts INTEGER NOT NULL, value REAL NOT NULL,
+            PRIMARY KEY (series, metric, ts)) WITHOUT ROWID""")
+        for table, _ in self.ROLLUPS:
+            conn.execute(f"""CREATE TABLE IF NOT EXISTS {table} (
+                series TEXT NOT NULL, metric TEXT NOT NULL, bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL, sum REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL,
+                PRIMARY KEY (series, metric, bucket)) WITHOUT ROWID""")
+        # Versão 1: a série do host deixou de ser "host" (colidia com um container de mesmo nome)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            for table in ('samples_raw',) + tuple(table for table, _ in self.ROLLUPS):
+                conn.execute(f"UPDATE OR IGNORE {table} SET series = ? WHERE series = 'host'", (HOST_SERIES,))
+            conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+        self.conn = conn
+        return conn
+
+    def record(self, series: str, metrics: Dict[str, float], ts: Optional[float] = None):
+        """Enfileira amostras em memória; a gravação acontece em lote no flush"""
+        ts = int(ts if ts is not None else time.time())
+        for metric, value in metrics.items():
+            if value is not None:
+                self.pending.append((series, metric, ts, float(value)))
+
+    def _write(self, rows: List[Tuple[str, str, int, float]]):
+        conn = self._connect()
+        with conn:
+            # Amostra repetida (mesma série, métrica e segundo) fica com a primeira, e só
+            # as linhas de fato inseridas entram nos agregados: bruto e resumos batem
+            inserted = []
+            for row in rows:
+                if conn.execute("INSERT OR IGNORE INTO samples_raw VALUES (?, ?, ?, ?)", row).rowcount:
+                    inserted.append(row)
+            rows = inserted
+            for table, size in self.ROLLUPS:
+                conn.executemany(
+                    f"""INSERT INTO {table} VALUES (?, ?, ?, 1, ?, ?, ?)
+                    ON CONFLICT (series, metric, bucket) DO UPDATE SET
+                        count = count + 1, sum = sum + excluded.sum,
+                        min = MIN(min, excluded.min), max = MAX(max, excluded.max)""",
+                    [(series, metric, ts - ts % size, value, value, value) for series, metric, ts, value in rows]
+                )
+        if time.time() - self.last_prune > 3600:
+            self._prune()
+
+    def _prune(self):
+        """Aplica a retenção de cada tabela"""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM samples_raw WHERE ts < ?", (now - METRICS_RAW_RETENTION_HOURS * 3600,))
+            conn.execute("DELETE FROM samples_1m WHERE bucket < ?", (now - METRICS_1M_RETENTION_DAYS * 86400,))
+            conn.execute("DELETE FROM samples_1h WHERE bucket < ?", (now - METRICS_1H_RETENTION_DAYS * 86400,))
+        self.last_prune = now
+
+    async def flush(self):
+        if not self.pending:
+            return
+        rows, self.pending = self.pending, []
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._write, rows)
+
+    def _query(self, series: str, metric: str, since: float, points: int) -> List[Tuple[int, float, float, float]]:
+        span = time.time() - since
+        conn = self._connect()
+        # Escolhe a menor resolução que ainda cobre o período e respeita a retenção
+        if span <= min(2 * 3600, METRICS_RAW_RETENTION_HOURS * 3600):
+            rows = conn.execute(
+                "SELECT ts, value, value, value FROM samples_raw WHERE series = ? AND metric = ? AND ts >= ? ORDER BY ts",
+                (series, metric, int(since))).fetchall()
+        else:
+            table = 'samples_1m' if span <= min(3 * 86400, METRICS_1M_RETENTION_DAYS * 86400) else 'samples_1h'
+            rows = conn.execute(
+                f"SELECT bucket, sum / count, min, max FROM {table} WHERE series = ? AND metric = ? AND bucket >= ? ORDER BY bucket",
+                (series, metric, int(since))).fetchall()
+
+        if len(rows) <= points:
+            return rows
+        # Reduz para no máximo `points` pontos agrupando linhas vizinhas
+        step = len(rows) / points
+        reduced = []
+        for i in range(points):
+            chunk = rows[int(i * step):int((i + 1) * step)]
+            reduced.append((chunk[0][0], sum(r[1] for r in chunk) / len(chunk),
+                            min(r[2] for r in chunk), max(r[3] for r in chunk)))
+        return reduced
+
+    async def query(self, series: str, metric: str, since: float, points: int = 60) -> List[Tuple[int, float, float, float]]:
+        """Série (ts, média, mínimo, máximo) de uma métrica desde `since` (epoch)"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._query, series, metric, since, points)
+
+    def close(self):
+        if self.conn is not None:
+            self.executor.submit(self.conn.close).result()
+            self.conn = None
+        self.executor.shutdown()
+
+metrics_store = MetricsStore(METRICS_DB_PATH) if METRICS_DB_PATH else None
+
+class StateStore:
+    """Estado persistente do bot em SQLite (modo WAL)
+
+    Guarda a configuração por servidor, o último snapshot de containers de
+    cada host e o histórico de notificações e alertas. A configuração é lida
+    uma vez no setup e servida da memória; o snapshot de um host só é lido
+    quando o monitoramento dele começa. Gravações ficam pendentes em memória
+    e vão para o banco em lote no flush, pela mesma thread dedicada.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.config: Dict[int, Dict[str, str]] = {}
+        self.pending_config: Dict[Tuple[int, str], Optional[str]] = {}
+        self.pending_snapshots: Dict[str, Dict[str, dict]] = {}
+        self.pending_events: List[Tuple[float, str, Optional[str], str, str]] = []
+        # Último snapshot gravado por host; só é acessado pela thread do banco
+        self.persisted: Dict[str, Dict[str, dict]] = {}
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='state-db')
+        self.conn = None
+        self.last_prune = 0.0
+
+    def _connect(self):
+        if self.conn is not None:
+            return self.conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS guild_config (
+            guild_id INTEGER NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,
+            PRIMARY KEY (guild_id, key)) WITHOUT ROWID""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS containers (
+            host TEXT NOT NULL, container_id TEXT NOT NULL, info TEXT NOT NULL,
+            PRIMARY KEY (host, container_id)) WITHOUT ROWID""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS events (
+            ts REAL NOT NULL, kind TEXT NOT NULL, host TEXT, name TEXT NOT NULL, detail TEXT NOT NULL)""")
+        conn.execute("CREATE INDEX IF NOT EXISTS events_ts ON events (ts)")
+        conn.commit()
+        self.conn = conn
+        return conn
+
+    # Configuração por servidor
+
+    def _load_config(self) -> Dict[int, Dict[str, str]]:
+        config: Dict[int, Dict[str, str]] = {}
+        for guild_id, key, value in self._connect().execute("SELECT guild_id, key, value FROM guild_config"):
+            config.setdefault(guild_id, {})[key] = value
+        return config
+
+    async def load(self):
+        """Carrega a configuração dos servidores para a memória"""
+        self.config = await asyncio.get_running_loop().run_in_executor(self.executor, self._load_config)
+
+    def get(self, guild_id: int, key: str, default: Optional[str] = None) -> Optional[str]:
+        return self.config.get(guild_id, {}).get(key, default)
+
+    def set(self, guild_id: int, key: str, value: Optional[str]):
+        """Altera (ou remove, com None) uma configuração do servidor"""
+        if value is None:
+            self.config.get(guild_id, {}).pop(key, None)
+        else:
+            self.config.setdefault(guild_id, {})[key] = value
+        self.pending_config[(guild_id, key)] = value
+
+    def guild_values(self, key: str) -> Dict[int, str]:
+        """Valor de uma configuração em cada servidor que a definiu"""
+        return {guild_id: values[key] for guild_id, values in self.config.items() if key in values}
+
+    # Snapshot de containers
+
+    def _load_snapshot(self, host: str) -> Dict[str, dict]:
+        rows = self._connect().execute("SELECT container_id, info FROM containers WHERE host = ?", (host,)).fetchall()
+        snapshot = {container_id: json.loads(info) for container_id, info in rows}
+        self.persisted[host] = dict(snapshot)
+        return snapshot
+
+    async def load_snapshot(self, host: str) -> Dict[str, dict]:
+        """Último snapshot de containers gravado para o host ({} se não houver)"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._load_snapshot, host)
+
+    def save_snapshot(self, host: str, containers: Dict[str, dict]):
+        self.pending_snapshots[host] = dict(containers)
+
+    # Histórico de notificações e alertas
+
+    def record_event(self, kind: str, host: Optional[str], name: str, detail: str = '', ts: Optional[float] = None):
+        self.pending_events.append((ts if ts is not None else time.time(), kind, host, name, detail))
+
+    def _events(self, since: float, limit: int) -> List[Tuple[float, str, Optional[str], str, str]]:
+        return self._connect().execute(
+            "SELECT ts, kind, host, name, detail FROM events WHERE ts >= ? ORDER BY ts DESC LIMIT ?",
+            (since, limit)).fetchall()
+
+    async def events(self, since: float, limit: int = 50) -> List[Tuple[float, str, Optional[str], str, str]]:
+        """Eventos do histórico desde `since` (epoch), do mais recente ao mais antigo"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._events, since, limit)
+
+    def _write(self, config: Dict[Tuple[int, str], Optional[str]], snapshots: Dict[str, Dict[str, dict]],
+               events: List[Tuple[float, str, Optional[str], str, str]]):
+        conn = self._connect()
+        with conn:
+            for (guild_id, key), value in config.items():
+                if value is None:
+                    conn.execute("DELETE FROM guild_config WHERE guild_id = ? AND key = ?", (guild_id, key))
+                else:
+                    conn.execute("INSERT OR REPLACE INTO guild_config VALUES (?, ?, ?)", (guild_id, key, value))
+            
+            # Só as linhas que mudaram desde a última gravação do host
+            for host, snapshot in snapshots.items():
+                if host not in self.persisted:
+                    self._load_snapshot(host)
+                persisted = self.persisted[host]
+                conn.executemany("DELETE FROM containers WHERE host = ? AND container_id = ?",
+                                 [(host, container_id) for container_id in persisted.keys() - snapshot.keys()])
+                conn.executemany("INSERT OR REPLACE INTO containers VALUES (?, ?, ?)",
+                                 [(host, container_id, json.dumps(info)) for container_id, info in snapshot.items()
+                                  if persisted.get(container_id) != info])
+                self.persisted[host] = snapshot
+            
+            conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?)", events)
+        
+        if time.time() - self.last_prune > 3600:
+            with conn:
+                conn.execute("DELETE FROM events WHERE ts < ?", (time.time() - STATE_HISTORY_DAYS * 86400,))
+            self.last_prune = time.time()
+
+    async def flush(self):
+        if not (self.pending_config or self.pending_snapshots or self.pending_events):
+            return
+        config, self.pending_config = self.pending_config, {}
+        snapshots, self.pending_snapshots = self.pending_snapshots, {}
+        events, self.pending_events = self.pending_events, []
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._write, config, snapshots, events)
+
+    def close(self):
+        if self.conn is not None:
+            self.executor.submit(self.conn.close).result()
+            self.conn = None
+        self.executor.shutdown()
+
+state_store = StateStore(STATE_DB_PATH) if STATE_DB_PATH else None
+
+# Métricas gravadas por série: nome da métrica -> chave nas stats do bot
+CONTAINER_METRICS = {
+    'cpu': 'cpu_percent',
+    'mem': 'memory_usage_mb',
+    'mem_pct': 'memory_percent',
+    'rx': 'network_rx_mb',
+    'tx': 'network_tx_mb'
+}
+HOST_METRICS = ('cpu', 'mem_pct', 'swap_pct', 'disk_pct', 'load1')
+# Série do host no histórico e nos alertas; '@' não é válido em nome de container, então
+# um container chamado "host" não se mistura com ela (nos comandos ele vira "/host")
+HOST_SERIES = '@host'
+
+def metric_series(name: str) -> str:
+    """Série de métricas de um nome digitado: "host" é o host; "/nome" força o container"""
+    return HOST_SERIES if name == 'host' else name.lstrip('/')
+
+def series_label(series: str) -> str:
+    return 'host' if series == HOST_SERIES else series
+
+class MetricRingBuffer:
+    """Buffer circular de capacidade fixa com as amostras recentes de um container
+
+    Timestamps e valores ficam em array('d') pré-alocados (8 bytes por ponto),
+    um array por métrica, todos no mesmo índice; a memória não cresce depois
+    de criado.
+    """
+    __slots__ = ('capacity', 'times', 'values', 'next', 'size')
+
+    def __init__(self, capacity: int, metrics=tuple(CONTAINER_METRICS)):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.values = {metric: array('d', bytes(8 * capacity)) for metric in metrics}
+        self.next = 0
+        self.size = 0
+
+    def append(self, ts: float, sample: Dict[str, float]):
+        i = self.next
+        self.times[i] = ts
+        for metric, values in self.values.items():
+            values[i] = sample.get(metric, 0.0)
+        self.next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def _ordered(self, data: array) -> array:
+        """Cópia do buffer em ordem cronológica (duas fatias, sem laço em Python)"""
+        if self.size < self.capacity:
+            return data[:self.size]
+        return data[self.next:] + data[:self.next]
+
+    def window(self, metric: str, seconds: float, now: Optional[float] = None) -> Optional[dict]:
+        """min/max/média/p95 de uma métrica nos últimos `seconds`"""
+        if not self.size or metric not in self.values:
+            return None
+        now = now if now is not None else time.time()
+        times = self._ordered(self.times)
+        start = bisect.bisect_left(times, now - seconds)
+        values = self._ordered(self.values[metric])[start:]
+        count = len(values)
+        if not count:
+            return None
+        # p95: só os 5% maiores precisam ser ordenados
+        tail = heapq.nlargest(max(1, count - int(count * 0.95)), values)
         return {
-            'cpu_percent': psutil.cpu_percent(interval=1),
-            'memory': psutil.virtual_memory(),
-            'disk': psutil.disk_usage('/'),
-            'uptime': time.time() - psutil.boot_time()
+            'min': min(values),
+            'max': max(values),
+            'avg': sum(values) / count,
+            'p95': tail[-1],
+            'count': count
         }
-    except Exception as e:
-        return {'error': str(e)}
 
-def get_detailed_container_info():
-    """Obtém informações detalhadas dos containers com recursos"""
-    if not docker_client:
-        return "❌ Cliente Docker não disponível"
-    
-    try:
-        containers = docker_client.containers.list(all=True)
-        detailed_info = []
-        
-        for container in containers:
-            stats = get_container_stats(container)
+class RecentMetrics:
+    """Ring buffers por container, indexados pelo id do ContainerState"""
+    def __init__(self, interval: float = RING_BUFFER_INTERVAL, hours: float = RING_BUFFER_HOURS):
+        self.capacity = max(1, int(hours * 3600 / interval))
+        self.buffers: Dict[str, MetricRingBuffer] = {}
+
+    def record(self, container_id: str, stats: dict, ts: Optional[float] = None):
+        buffer = self.buffers.get(container_id)
+        if buffer is None:
+            buffer = self.buffers[container_id] = MetricRingBuffer(self.capacity)
+        buffer.append(ts if ts is not None else time.time(),
+                      {metric: stats[key] for metric, key in CONTAINER_METRICS.items()})
+
+    def retain(self, container_ids: Set[str]):
+        """Descarta buffers de containers que não existem mais"""
+        for container_id in set(self.buffers) - container_ids:
+            del self.buffers[container_id]
+
+    def window(self, container_id: str, metric: str, seconds: float) -> Optional[dict]:
+        buffer = self.buffers.get(container_id)
+        return buffer.window(metric, seconds) if buffer else None
+
+recent_metrics = RecentMetrics()
+
+def host_metric_values(system_stats: dict) -> Dict[str, float]:
+    """Extrai as métricas gravadas de uma amostra do HostMetricsSampler"""
+    return {
+        'cpu': system_stats['cpu_percent'],
+        'mem_pct': system_stats['memory'].percent,
+        'swap_pct': system_stats['swap'].percent,
+        'disk_pct': system_stats['disk'].percent,
+        'load1': system_stats['load_avg'][0]
+    }
+
+def get_system_stats():
+    """Obtém estatísticas do sistema host (última amostra do HostMetricsSampler)"""
+    if host_sampler.latest is None:
+        return host_sampler.sample()
+    return host_sampler.latest
+
+def build_detailed_info(container, stats: dict, images: Optional[ImageIndex] = None, host: Optional[str] = None) -> dict:
+    """Monta as informações detalhadas de um container a partir das stats já coletadas"""
+    return {
+        'host': host,
+        'name': container.name,
+        'status': container.status,
+        'image': resolve_image_name(container.attrs, images),
+        'created': container.attrs['Created'],
+        'health': (container.attrs['State'].get('Health') or {}).get('Status'),
+        'stats': stats
+    }
+
+def get_recent_containers_info(client, since_time: datetime, images: Optional[ImageIndex] = None,
+                               host: Optional[str] = None) -> List[dict]:
+    """Obtém informações dos containers criados depois de since_time"""
+    recent_containers = []
+    for container in client.containers.list(all=True):
+        created_str = container.attrs['Created']
+        created_time = datetime.fromisoformat(created_str.replace('Z', '+00:00')).replace(tzinfo=None)
+
+        if created_time > since_time:
+            recent_containers.append(get_container_info(container, images, host))
+
+    return recent_containers
+
+class StatsStreamEngine:
+    """Mantém um stream de stats aberto por container rodando
+
+    Cada stream roda em uma thread própria e guarda apenas a amostra mais recente
+    já convertida; os comandos leem esse cache em memória em vez de abrir uma
+    nova coleta no daemon. Os streams acompanham o diff do ContainerState:
+    abrem quando o container sobe e fecham quando ele para.
+    """
+    def __init__(self, client, max_streams: int = STATS_STREAM_MAX, max_age: float = STATS_CACHE_MAX_AGE):
+        self.client = client
+        self.max_streams = max_streams
+        self.max_age = max_age
+        self.samples: Dict[str, Tuple[float, dict]] = {}
+        self.streams: Dict[str, threading.Event] = {}
+        self.lock = threading.Lock()
+
+    def sync(self, running_ids: Set[str]):
+        """Abre streams para containers novos e fecha os dos que pararam"""
+        with self.lock:
+            for container_id in set(self.streams) - running_ids:
+                self.streams.pop(container_id).set()
+                self.samples.pop(container_id, None)
+
+            for container_id in running_ids - set(self.streams):
+                if len(self.streams) >= self.max_streams:
+                    logger.warning(f"Limite de {self.max_streams} streams de stats atingido")
+                    break
+                stop = threading.Event()
+                self.streams[container_id] = stop
+                threading.Thread(target=self._consume, args=(container_id, stop),
+                                 name=f"stats-{container_id[:12]}", daemon=True).start()
+
+    def _consume(self, container_id: str, stop: threading.Event):
+        """Lê o stream de um container até ele terminar ou ser fechado"""
+        try:
+            for raw in self.client.api.stats(container_id, stream=True, decode=True):
+                if stop.is_set():
+                    break
+                try:
+                    sample = parse_container_stats(raw)
+                except (KeyError, TypeError):
+                    # Amostras de um container que acabou de parar vêm incompletas
+                    continue
+                with self.lock:
+                    if self.streams.get(container_id) is stop:
+                        self.samples[container_id] = (time.monotonic(), sample)
+        except Exception as e:
+            if not stop.is_set():
+                logger.warning(f"Stream de stats do container {container_id[:12]} encerrado: {e}")
+        finally:
+            # O stream termina sozinho quando o container para; libera a vaga para reabrir no próximo sync
+            with self.lock:
+                if self.streams.get(container_id) is stop:
+                    del self.streams[container_id]
+                    self.samples.pop(container_id, None)
+
+    def get(self, container_id: str) -> Optional[dict]:
+        """Amostra mais recente do container, ou None se não houver uma recente o bastante"""
+        entry = self.samples.get(container_id)
+        if entry is None or time.monotonic() - entry[0] > self.max_age:
+            return None
+        return entry[1]
+
+    def close(self):
+        self.sync(set())
+
+class AsyncDocker:
+    """Fachada assíncrona para o cliente Docker
+
+    O docker-py é bloqueante: cada chamada roda em um pool de threads limitado,
+    com timeout por chamada, para não travar o event loop (heartbeat do gateway
+    e demais comandos) enquanto o daemon responde.
+    """
+    def __init__(self, client, max_workers: int = DOCKER_EXECUTOR_WORKERS, timeout: float = DOCKER_CALL_TIMEOUT,
+                 stats_concurrency: int = STATS_CONCURRENCY, stats_deadline: float = STATS_DEADLINE,
+                 stats_engine: Optional[StatsStreamEngine] = None, state: Optional[ContainerState] = None,
+                 images: Optional[ImageIndex] = None, host: Optional[str] = None):
+        self.client = client
+        self.stats_engine = stats_engine
+        self.state = state
+        self.images = images
+        self.host = host
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='docker')
+        # Pool separado para stats: uma varredura lenta não ocupa as threads dos comandos de controle
+        self.stats_deadline = stats_deadline
+        self.stats_semaphore = asyncio.Semaphore(stats_concurrency)
+        self.stats_executor = ThreadPoolExecutor(max_workers=stats_concurrency, thread_name_prefix='docker-stats')
+        # Containers com uma coleta ainda rodando (ex.: travada depois de estourar o prazo)
+        self.stats_inflight: Set[str] = set()
+
+    async def run(self, func, *args, call_timeout: Optional[float] = None, executor: Optional[ThreadPoolExecutor] = None, **kwargs):
+        """Executa uma função bloqueante no pool do Docker com timeout"""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(executor or self.executor, functools.partial(func, *args, **kwargs))
+        # Inclui a espera na fila do pool: é o que o comando sente
+        with perf.timer('docker', getattr(func, '__qualname__', repr(func))):
+            return await asyncio.wait_for(future, call_timeout or self.timeout)
+
+    async def ping(self):
+        return await self.run(self.client.ping)
+
+    async def get_container(self, container_name: str):
+        return await self.run(self.client.containers.get, container_name)
+
+    async def get_container_info(self, container) -> dict:
+        return await self.run(get_container_info, container, self.images, self.host)
+
+    async def get_all_containers_info(self, previous: Optional[Dict[str, dict]] = None) -> Dict[str, dict]:
+        # Timeout propaga: um {} aqui seria interpretado como "todos removidos"
+        return await self.run(get_all_containers_info, self.client, previous, self.images, self.host)
+
+    async def get_recent_containers_info(self, since_time: datetime) -> List[dict]:
+        return await self.run(get_recent_containers_info, self.client, since_time, self.images, self.host)
+
+    def cached_stats(self, container) -> Optional[dict]:
+        """Stats do cache do engine de streaming, se houver uma amostra recente"""
+        if self.stats_engine and container.status == 'running':
+            return self.stats_engine.get(container.id)
+        return None
+
+    async def get_container_stats(self, container) -> dict:
+        cached = self.cached_stats(container)
+        if cached is not None:
+            return cached
+        return await self.run(get_container_stats, container)
+
+    async def collect_stats(self, containers: list) -> List[dict]:
+        """Coleta stats de vários containers em paralelo
+
+        Cada container tem seu próprio prazo, contado a partir do momento em que
+        a coleta começa a rodar; quem não responde a tempo volta marcado como
+        desatualizado em vez de atrasar a resposta inteira.
+        """
+        async def fetch(container):
+            if container.status != 'running':
+                return get_container_stats(container)
+
+            cached = self.cached_stats(container)
+            if cached is not None:
+                return cached
+
+            # Uma coleta travada do mesmo container não ganha uma segunda thread
+            if container.id in self.stats_inflight:
+                return stale_container_stats()
+            
+            # Sem thread livre dentro do prazo (todas presas em containers que não respondem)
+            try:
+                await asyncio.wait_for(self.stats_semaphore.acquire(), self.stats_deadline)
+            except asyncio.TimeoutError:
+                logger.warning(f"Stats do container {container.name}: nenhuma thread livre em {self.stats_deadline}s")
+                return stale_container_stats()
+            
+            # O slot só é devolvido quando a thread termina: uma coleta travada ocupa a
+            # própria thread, e as seguintes nunca esperam na fila do pool
+            self.stats_inflight.add(container.id)
+            future = asyncio.get_running_loop().run_in_executor(self.stats_executor, get_container_stats, container)
             
-            info = {
-                'name': container.name,
-                'status': container.status,
-                'image': container.image.tags[0] if container.image.tags else 'unknown',
-                'created': container.attrs['Created'],
+            def release(_, container_id=container.id):
+                self.stats_inflight.discard(container_id)
+                self.stats_semaphore.release()
+            future.add_done_callback(release)
+            try:
+                with perf.timer('docker', get_container_stats.__qualname__):
+                    return await asyncio.wait_for(asyncio.shield(future), self.stats_deadline)
+            except asyncio.TimeoutError:
+                logger.warning(f"Stats do container {container.name} excederam {self.stats_deadline}s")
+                return stale_container_stats()
+
+        return await asyncio.gather(*(fetch(container) for container in containers))
+
+    def detailed_info_from_cache(self) -> Optional[List[dict]]:
+        """Monta a listagem detalhada só com dados em memória
+
+        Só vale enquanto os eventos mantêm o ContainerState atualizado e todo
+        container rodando tem amostra recente no engine de streaming; caso
+        contrário retorna None e a listagem vai ao daemon.
+        """
+        if not (self.state and self.state.live and self.stats_engine):
+            return None
+
+        detailed_info = []
+        for container_id, info in list(self.state.containers.items()):
+            if info['status'] == 'running':
+                stats = self.stats_engine.get(container_id)
+                if stats is None:
+                    return None
+            else:
+                stats = idle_container_stats(info['status'])
+            detailed_info.append({
+                'host': self.host,
+                'name': info['name'],
+                'status': info['status'],
+                'image': info['image'],
+                'created': info['created_at'],
+                'health': info.get('health'),
                 'stats': stats
-            }
-            detailed_info.append(info)
-        
+            })
         return detailed_info
-    except Exception as e:
-        return f"❌ Erro ao obter containers: {str(e)}"
 
-async def send_deploy_notification(channel, changes: Dict[str, List]):
-    """Envia notificação de deploy para o canal especificado"""
-    if not channel:
-        return
-    
+    async def get_detailed_container_info(self):
+        cached = self.detailed_info_from_cache()
+        if cached is not None:
+            return cached
+
+        try:
+            containers = await self.run(self.client.containers.list, all=True)
+        except asyncio.TimeoutError:
+            return f"⏰ Docker não respondeu em {self.timeout:.0f}s"
+        except Exception as e:
+            return f"❌ Erro ao obter containers: {str(e)}"
+
+        stats_list = await self.collect_stats(containers)
+
+        try:
+            return await self.run(lambda: [build_detailed_info(c, stats, self.images, self.host) for c, stats in zip(containers, stats_list)])
+        except asyncio.TimeoutError:
+            return f"⏰ Docker não respondeu em {self.timeout:.0f}s"
+        except Exception as e:
+            return f"❌ Erro ao obter containers: {str(e)}"
+
+    async def restart_container(self, container):
+        # O timeout da chamada precisa cobrir a espera do Docker antes do SIGKILL
+        return await self.run(container.restart, timeout=DOCKER_STOP_TIMEOUT,
+                              call_timeout=self.timeout + DOCKER_STOP_TIMEOUT)
+
+    async def start_container(self, container):
+        return await self.run(container.start)
+
+    async def stop_container(self, container):
+        return await self.run(container.stop, timeout=DOCKER_STOP_TIMEOUT,
+                              call_timeout=self.timeout + DOCKER_STOP_TIMEOUT)
+
+    async def prune_containers(self) -> dict:
+        return await self.run(self.client.containers.prune)
+
+def display_name(info: dict) -> str:
+    """Nome do container, qualificado com o host quando há mais de um"""
+    if len(docker_hosts) > 1 and info.get('host'):
+        return f"{info['host']}/{info['name']}"
+    return info['name']
+
+# Limites do Discord para embeds e mensagens
+EMBED_MAX_FIELDS = 25
+EMBED_MAX_CHARS = 6000
+EMBED_FIELD_MAX_CHARS = 1024
+MESSAGE_MAX_EMBEDS = 10
+
+def pack_embed_fields(title: str, color: discord.Color, fields: List[Tuple[str, str]]) -> List[discord.Embed]:
+    """Distribui campos no menor número de embeds que respeita os limites do Discord"""
+    embeds = []
+    embed = None
+    for name, value in fields:
+        value = value[:EMBED_FIELD_MAX_CHARS]
+        if embed is None or len(embed.fields) >= EMBED_MAX_FIELDS or len(embed) + len(name) + len(value) > EMBED_MAX_CHARS:
+            embed = discord.Embed(title=title if not embeds else f"{title} (cont.)", color=color, timestamp=datetime.now())
+            embeds.append(embed)
+        embed.add_field(name=name, value=value, inline=False)
+    return embeds
+
+def pack_messages(embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+    """Agrupa embeds em mensagens de até 10 embeds e 6000 caracteres"""
+    messages, current, size = [], [], 0
+    for embed in embeds:
+        if current and (len(current) >= MESSAGE_MAX_EMBEDS or size + len(embed) > EMBED_MAX_CHARS):
+            messages.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += len(embed)
+    if current:
+        messages.append(current)
+    return messages
+
+def build_deploy_embeds(changes: Dict[str, List]) -> List[discord.Embed]:
+    """Monta os embeds de uma notificação de deploy"""
     embeds = []
     
     # Containers criados
-    if changes['created']:
-        embed = discord.Embed(
-            title="🚀 Novos Containers Implantados",
-            color=discord.Color.green(),
-            timestamp=datetime.now()
-        )
-        
+    if changes.get('created'):
+        fields = []
         for container in changes['created']:
             ports_info = ""
             if container.get('ports'):
@@ -313,186 +1475,1084 @@ async def send_deploy_notification(channel, changes: Dict[str, List]):
                             ports.append(f"{binding['HostPort']}:{port}")
                 if ports:
                     ports_info = f"\nPortas: {', '.join(ports)}"
-            
-            embed.add_field(
-                name=f"📦 {container['name']}",
-                value=f"Imagem: `{container['image']}`\nStatus: {container['status']}{ports_info}",
-                inline=False
-            )
-        
-        embeds.append(embed)
+            fields.append((f"📦 {display_name(container)}",
+                           f"Imagem: `{container['image']}`\nStatus: {container['status']}{ports_info}"))
+        embeds += pack_embed_fields("🚀 Novos Containers Implantados", discord.Color.green(), fields)
     
     # Containers removidos
-    if changes['removed']:
-        embed = discord.Embed(
-            title="🗑️ Containers Removidos",
-            color=discord.Color.red(),
-            timestamp=datetime.now()
-        )
-        
-        for container in changes['removed']:
-            embed.add_field(
-                name=f"📦 {container['name']}",
-                value=f"Imagem: `{container['image']}`\nID: `{container['id']}`",
-                inline=False
-            )
-        
-        embeds.append(embed)
+    if changes.get('removed'):
+        fields = [(f"📦 {display_name(container)}", f"Imagem: `{container['image']}`\nID: `{container['id']}`")
+                  for container in changes['removed']]
+        embeds += pack_embed_fields("🗑️ Containers Removidos", discord.Color.red(), fields)
     
     # Containers reiniciados
-    if changes['restarted']:
-        embed = discord.Embed(
-            title="🔄 Containers Reiniciados",
-            color=discord.Color.orange(),
-            timestamp=datetime.now()
-        )
-        
-        for container in changes['restarted']:
-            embed.add_field(
-                name=f"📦 {container['name']}",
-                value=f"Imagem: `{container['image']}`\nStatus: {container['status']}",
-                inline=False
-            )
-        
-        embeds.append(embed)
+    if changes.get('restarted'):
+        fields = [(f"📦 {display_name(container)}", f"Imagem: `{container['image']}`\nStatus: {container['status']}")
+                  for container in changes['restarted']]
+        embeds += pack_embed_fields("🔄 Containers Reiniciados", discord.Color.orange(), fields)
     
     # Mudanças de status
-    if changes['status_changed']:
-        embed = discord.Embed(
-            title="⚡ Mudanças de Status",
-            color=discord.Color.blue(),
-            timestamp=datetime.now()
-        )
-        
+    if changes.get('status_changed'):
+        fields = []
         for change in changes['status_changed']:
             container = change['container']
             status_emoji = "✅" if change['new_status'] == 'running' else "❌"
-            
-            embed.add_field(
-                name=f"{status_emoji} {container['name']}",
-                value=f"Status: `{change['old_status']}` → `{change['new_status']}`\nImagem: `{container['image']}`",
-                inline=False
-            )
-        
-        embeds.append(embed)
+            fields.append((f"{status_emoji} {display_name(container)}",
+                           f"Status: `{change['old_status']}` → `{change['new_status']}`\nImagem: `{container['image']}`"))
+        embeds += pack_embed_fields("⚡ Mudanças de Status", discord.Color.blue(), fields)
     
-    # Enviar embeds
-    for embed in embeds:
+    # Mudanças de saúde (healthcheck)
+    if changes.get('health_changed'):
+        fields = []
+        for change in changes['health_changed']:
+            container = change['container']
+            health_emoji = "❌" if change['new_health'] == 'unhealthy' else "✅"
+            fields.append((f"{health_emoji} {display_name(container)}",
+                           f"Saúde: `{change['old_health']}` → `{change['new_health']}`\nImagem: `{container['image']}`"))
+        embeds += pack_embed_fields("🩺 Mudanças de Saúde", discord.Color.dark_red(), fields)
+    
+    # Containers em loop de reinício
+    if changes.get('flapping'):
+        fields = [(f"🔁 {display_name(flap['container'])}",
+                   f"Reiniciou {flap['count']}× em {format_age(flap['window'])}\nImagem: `{flap['container']['image']}`\n"
+                   f"Notificações suspensas até estabilizar")
+                  for flap in changes['flapping']]
+        embeds += pack_embed_fields("🔁 Containers em Loop de Reinício", discord.Color.dark_orange(), fields)
+    
+    # Containers que saíram do loop
+    if changes.get('stabilized'):
+        fields = [(f"🟢 {display_name(entry['container'])}",
+                   f"{entry['count']} reinícios em {format_age(entry['duration'])}\n"
+                   f"Sem reinícios há {format_age(FLAP_STABLE_AFTER)}\nStatus: {entry['container']['status']}")
+                  for entry in changes['stabilized']]
+        embeds += pack_embed_fields("🟢 Containers Estabilizados", discord.Color.green(), fields)
+    
+    return embeds
+
+class ChannelRateLimiter:
+    """Token bucket por canal: no máximo `capacity` mensagens a cada `per` segundos"""
+    def __init__(self, capacity: int = NOTIFY_RATE_LIMIT, per: float = 5.0):
+        self.capacity = capacity
+        self.rate = capacity / per
+        self.buckets: Dict[int, Tuple[float, float]] = {}
+
+    async def acquire(self, channel_id: int):
+        """Reserva um envio no canal e espera a vez dele
+
+        A reserva é feita de uma vez, sem await, e o saldo pode ficar negativo:
+        cada chamada espera só pelo próprio canal, na ordem em que chegou.
+        """
+        now = time.monotonic()
+        tokens, last = self.buckets.get(channel_id, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last) * self.rate) - 1
+        self.buckets[channel_id] = (tokens, now)
+        if tokens < 0:
+            await asyncio.sleep(-tokens / self.rate)
+
+channel_rate_limiter = ChannelRateLimiter()
+
+async def send_embeds(channel, embeds: List[discord.Embed]):
+    """Envia embeds no menor número de mensagens, respeitando o rate limit do canal"""
+    for message_embeds in pack_messages(embeds):
+        await channel_rate_limiter.acquire(channel.id)
         try:
-            await channel.send(embed=embed)
+            with perf.timer('discord', 'channel.send'):
+                await channel.send(embeds=message_embeds)
         except Exception as e:
             logger.error(f"Erro ao enviar notificação: {e}")
 
-@tasks.loop(seconds=30)
-async def monitor_containers():
-    """Task que monitora mudanças nos containers"""
-    global container_state
-    
-    if not docker_client:
+async def send_deploy_notification(channel, changes: Dict[str, List]):
+    """Envia notificação de deploy para o canal especificado"""
+    if not channel:
         return
-    
-    try:
-        current_containers = get_all_containers_info()
-        changes = container_state.get_container_changes(current_containers)
+    await send_embeds(channel, build_deploy_embeds(changes))
+
+def deploy_channel_id(guild_id: Optional[int]) -> int:
+    """Canal de notificações do servidor: o definido por !set_deploy_channel ou o DEPLOY_CHANNEL_ID"""
+    configured = state_store.get(guild_id, 'deploy_channel_id') if state_store and guild_id else None
+    return int(configured) if configured else DEPLOY_CHANNEL_ID
+
+def deploy_channels() -> list:
+    """Canais que recebem notificações: um por servidor configurado, mais o DEPLOY_CHANNEL_ID nos demais"""
+    configured = state_store.guild_values('deploy_channel_id') if state_store else {}
+    channels = [bot.get_channel(int(channel_id)) for channel_id in configured.values()]
+    default = bot.get_channel(DEPLOY_CHANNEL_ID) if DEPLOY_CHANNEL_ID else None
+    if default and getattr(getattr(default, 'guild', None), 'id', None) not in configured:
+        channels.append(default)
+    return [channel for channel in channels if channel]
+
+def change_history_detail(category: str, entry: dict) -> str:
+    """Resumo de uma mudança para o histórico"""
+    if category == 'status_changed':
+        return f"{entry['old_status']} → {entry['new_status']}"
+    if category == 'health_changed':
+        return f"{entry['old_health']} → {entry['new_health']}"
+    if category in ('flapping', 'stabilized'):
+        return f"{entry['count']} inícios"
+    return entry.get('image', '')
+
+class NotificationQueue:
+    """Fila de saída das notificações de deploy
+
+    Mudanças que chegam dentro da janela de debounce (ex.: um `docker compose
+    up` de 40 serviços) são juntas e enviadas de uma vez; uma mudança mais
+    nova do mesmo container na mesma categoria substitui a anterior.
+    """
+    def __init__(self, debounce: float = NOTIFY_DEBOUNCE):
+        self.debounce = debounce
+        self.pending: Dict[str, Dict[str, object]] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(entry) -> str:
+        container = entry.get('container', entry)
+        return f"{container.get('host')}/{container.get('full_id') or container.get('id')}"
+
+    def enqueue(self, changes: Dict[str, List]):
+        for category, entries in changes.items():
+            bucket = self.pending.setdefault(category, {})
+            for entry in entries:
+                key = self._key(entry)
+                # Container criado que subiu antes do envio: sai só como novo, já com o status atual
+                if category == 'status_changed' and key in self.pending.get('created', {}):
+                    self.pending['created'][key] = entry['container']
+                    continue
+                bucket[key] = entry
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        # Mudanças que chegam enquanto um lote é enviado saem no lote seguinte
+        while any(self.pending.values()):
+            await asyncio.sleep(self.debounce)
+            changes = {category: list(entries.values()) for category, entries in self.pending.items()}
+            self.pending = {}
+            
+            if state_store:
+                for category, entries in changes.items():
+                    for entry in entries:
+                        container = entry.get('container', entry)
+                        state_store.record_event(category, container.get('host'), display_name(container),
+                                                 change_history_detail(category, entry))
+            
+            for channel in deploy_channels():
+                await send_deploy_notification(channel, changes)
+
+notification_queue = NotificationQueue()
+
+# Eventos de container que alteram o que o monitoramento reporta, e de imagem que alteram o ImageIndex
+CONTAINER_EVENT_FILTERS = {
+    'type': ['container', 'image'],
+    'event': ['create', 'start', 'die', 'destroy', 'restart', 'health_status', 'pull', 'tag', 'untag', 'delete']
+}
+
+class DockerEventStream:
+    """Stream de eventos do Docker entregue ao event loop em lotes
+
+    O iterador do docker-py é bloqueante, então é consumido em uma thread que
+    repassa cada evento para uma asyncio.Queue. Eventos que chegam dentro da
+    janela de debounce saem no mesmo lote (ex.: die + start de um restart).
+    """
+    def __init__(self, docker_api: AsyncDocker, filters: dict = CONTAINER_EVENT_FILTERS, debounce: float = EVENTS_DEBOUNCE):
+        self.docker = docker_api
+        self.filters = filters
+        self.debounce = debounce
+        self.stream = None
+        self.queue: Optional[asyncio.Queue] = None
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.stream = await self.docker.run(self.docker.client.events, decode=True, filters=self.filters)
+        threading.Thread(target=self._pump, args=(loop,), name='docker-events', daemon=True).start()
+
+    def _pump(self, loop):
+        """Thread: repassa eventos para a fila; None sinaliza fim do stream"""
+        try:
+            for event in self.stream:
+                loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except Exception as e:
+            logger.warning(f"Stream de eventos do Docker interrompido: {e}")
+        finally:
+            try:
+                loop.call_soon_threadsafe(self.queue.put_nowait, None)
+            except RuntimeError:
+                pass  # Event loop já encerrado
+
+    async def batches(self):
+        """Gera lotes de eventos até o stream terminar"""
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await self.queue.get()
+            if event is None:
+                return
+
+            batch = [event]
+            deadline = loop.time() + self.debounce
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    yield batch
+                    return
+                batch.append(event)
+            yield batch
+
+    def close(self):
+        if self.stream is not None:
+            # CancellableStream fecha o socket e desbloqueia a thread
+            self.stream.close()
+
+class DeferredDockerClient:
+    """DockerClient criado só quando o daemon responde
+
+    O docker-py consulta a versão da API do daemon ao criar o cliente; adiando
+    a criação, um host fora do ar continua registrado e o monitoramento tenta
+    conectar de novo a cada iteração. Até lá, qualquer uso falha como um
+    daemon indisponível.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.client = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """Cria o cliente se ainda não existe (bloqueante: rodar fora do event loop)"""
+        with self.lock:
+            if self.client is None:
+                self.client = self.factory()
+        return self.client
+
+    def __getattr__(self, name):
+        if self.client is None:
+            raise docker.errors.DockerException("Daemon Docker ainda não conectado")
+        return getattr(self.client, name)
+
+class DockerHost:
+    """Um daemon Docker monitorado
+
+    Cada host tem seu cliente e pool de threads, ContainerState, índice de
+    imagens, streams de stats e task de monitoramento próprios: um nó lento
+    não atrasa os demais, e as visões dos comandos juntam todos em paralelo.
+    """
+    def __init__(self, name: str, base_url: Optional[str] = None):
+        self.name = name
+        self.base_url = base_url
+        self.client = DeferredDockerClient(self.make_client)
+        self.state = ContainerState()
+        self.images = ImageIndex(self.client)
+        
+        # Streams de stats com cliente próprio para não disputar o pool de conexões dos comandos
+        self.stats_engine = None
+        if STATS_STREAMING:
+            self.stats_engine = StatsStreamEngine(DeferredDockerClient(lambda: self.make_client(max_pool_size=STATS_STREAM_MAX)))
+        
+        # Fachada assíncrona usada pelos comandos e pelo monitoramento
+        self.docker = AsyncDocker(self.client, stats_engine=self.stats_engine, state=self.state,
+                                  images=self.images, host=name)
+        self.initialized = False
+        self.monitor = tasks.loop(seconds=EVENTS_RECONNECT_DELAY)(self.watch_events)
+        self.monitor.before_loop(self.load_initial_state)
+
+    async def connect(self):
+        """Cria os clientes do host, se ainda não criados"""
+        await self.docker.run(self.client.connect)
+        if self.stats_engine:
+            await self.docker.run(self.stats_engine.client.connect)
+
+    def close(self):
+        """Encerra o monitoramento, os streams de stats, os pools de threads e os clientes do host"""
+        self.monitor.cancel()
+        if self.stats_engine:
+            self.stats_engine.close()
+        # Sem esperar: uma chamada travada no daemon não segura o encerramento
+        self.docker.executor.shutdown(wait=False, cancel_futures=True)
+        self.docker.stats_executor.shutdown(wait=False, cancel_futures=True)
+        for client in (self.client, self.stats_engine.client if self.stats_engine else None):
+            if client is not None and client.client is not None:
+                client.close()
+
+    def make_client(self, **kwargs):
+        """Cliente docker-py para o endpoint (socket local, tcp com TLS opcional ou ssh)"""
+        if not self.base_url:
+            return docker.from_env(**kwargs)
+        
+        tls = None
+        cert_path = os.getenv(f"DOCKER_CERT_PATH_{self.name.upper()}")
+        if cert_path:
+            tls = docker.tls.TLSConfig(
+                client_cert=(os.path.join(cert_path, 'cert.pem'), os.path.join(cert_path, 'key.pem')),
+                ca_cert=os.path.join(cert_path, 'ca.pem'),
+                verify=True
+            )
+        return docker.DockerClient(base_url=self.base_url, tls=tls,
+                                   use_ssh_client=self.base_url.startswith('ssh://'), **kwargs)
+
+    def sync_stats_streams(self):
+        """Alinha os streams de stats com os containers rodando no ContainerState"""
+        if self.stats_engine:
+            self.stats_engine.sync({cid for cid, info in self.state.containers.items() if info.get('status') == 'running'})
+
+    def cached_container_stats(self) -> Dict[str, dict]:
+        """Stats em memória dos containers rodando, por nome de exibição, sem chamadas ao Docker"""
+        if not self.stats_engine:
+            return {}
+        snapshot = {}
+        for container_id, info in list(self.state.containers.items()):
+            if info.get('status') == 'running':
+                stats = self.stats_engine.get(container_id)
+                if stats is not None:
+                    snapshot[display_name(info)] = stats
+        return snapshot
+
+    async def apply_snapshot(self, current_containers: Dict[str, dict]):
+        """Compara um snapshot com o ContainerState, notifica mudanças e atualiza o estado"""
+        changed = current_containers != self.state.containers
+        changes = self.state.get_container_changes(current_containers)
         
-        # Se há mudanças, enviar notificações
+        # Se há mudanças, enfileirar notificações
         if any(changes.values()):
-            deploy_channel = bot.get_channel(DEPLOY_CHANNEL_ID) if DEPLOY_CHANNEL_ID else None
+            notification_queue.enqueue(changes)
             
-            if deploy_channel:
-                await send_deploy_notification(deploy_channel, changes)
-            
-            logger.info(f"Mudanças detectadas: {sum(len(v) for v in changes.values())} alterações")
+            logger.info(f"[{self.name}] Mudanças detectadas: {sum(len(v) for v in changes.values())} alterações")
         
         # Atualizar estado
         for container_id, info in current_containers.items():
-            container_state.update_container(container_id, info)
+            self.state.update_container(container_id, info)
         
         # Remover containers que não existem mais
-        for container_id in list(container_state.containers.keys()):
+        for container_id in list(self.state.containers.keys()):
             if container_id not in current_containers:
-                container_state.remove_container(container_id)
-    
-    except Exception as e:
-        logger.error(f"Erro no monitoramento: {e}")
+                self.state.remove_container(container_id)
+        
+        if state_store and changed:
+            state_store.save_snapshot(self.name, self.state.containers)
+        self.sync_stats_streams()
 
-@monitor_containers.before_loop
-async def before_monitor():
-    """Aguarda o bot estar pronto antes de iniciar o monitoramento"""
-    await bot.wait_until_ready()
-    
-    # Inicializar estado dos containers
-    if docker_client:
+    async def apply_events(self, batch: List[dict]):
+        """Inspeciona apenas os containers citados no lote de eventos"""
+        if any(event.get('Type') == 'image' for event in batch):
+            try:
+                await self.docker.run(self.images.refresh)
+            except Exception as e:
+                logger.error(f"[{self.name}] Erro ao recarregar índice de imagens: {e}")
+        
+        container_ids = {event.get('id') or event.get('Actor', {}).get('ID') for event in batch if event.get('Type', 'container') == 'container'}
+        container_ids.discard(None)
+        if not container_ids:
+            return
+
+        async def inspect(container_id):
+            try:
+                container = await self.docker.get_container(container_id)
+                return container_id, await self.docker.get_container_info(container)
+            except docker.errors.NotFound:
+                return container_id, None
+
+        snapshot = dict(self.state.containers)
+        for result in await asyncio.gather(*(inspect(cid) for cid in container_ids), return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"[{self.name}] Erro ao inspecionar container após evento: {result}")
+                continue
+            container_id, info = result
+            if info:
+                snapshot[container_id] = info
+            elif info is None:
+                snapshot.pop(container_id, None)
+
+        await self.apply_snapshot(snapshot)
+
+    async def watch_events(self):
+        """Iteração do monitoramento pelo stream de eventos do Docker
+
+        Cada iteração assina o stream, faz uma ressincronização completa e então
+        aplica só os eventos; quando o stream cai, a próxima iteração reconecta.
+        """
+        # Host fora do ar desde o boot: o estado inicial só é carregado quando ele responder
+        if not self.initialized:
+            await self.load_initial_state()
+            if not self.initialized:
+                return
+        
+        events = DockerEventStream(self.docker)
+        try:
+            await events.open()
+            # Ressincroniza depois de assinar: o que acontecer no meio chega como evento.
+            # Inspect completo: um reinício com o stream fora do ar vai de running a running
+            # e só aparece no StartedAt, que a listagem esparsa não traz
+            with perf.timer('monitor', f'{self.name}: resync'):
+                await self.apply_snapshot(await self.docker.get_all_containers_info())
+            self.state.live = True
+            
+            async for batch in events.batches():
+                started = time.perf_counter()
+                await self.apply_events(batch)
+                elapsed = time.perf_counter() - started
+                perf.record('monitor', f'{self.name}: events', elapsed)
+                logger.debug(f"[{self.name}] Lote de {len(batch)} eventos aplicado em {elapsed * 1000:.0f} ms")
+            
+            logger.warning(f"[{self.name}] Stream de eventos do Docker encerrado, reconectando...")
+        
+        except Exception as e:
+            logger.error(f"[{self.name}] Erro no monitoramento: {e}")
+        finally:
+            self.state.live = False
+            events.close()
+
+    async def load_initial_state(self):
+        """Aguarda o bot estar pronto e carrega o estado inicial
+
+        Sem snapshot gravado nada é notificado; com um, o estado parte dele e
+        só o que mudou enquanto o bot estava fora do ar é reportado.
+        """
+        await bot.wait_until_ready()
+        
         try:
-            initial_containers = get_all_containers_info()
+            await self.connect()
+            # Listagem completa: um reinício com o bot parado não muda o estado na listagem esparsa
+            initial_containers = await self.docker.get_all_containers_info()
+            saved = await state_store.load_snapshot(self.name) if state_store else {}
+            if saved:
+                for container_id, info in saved.items():
+                    self.state.update_container(container_id, info)
+                logger.info(f"[{self.name}] Snapshot anterior: {len(saved)} containers; comparando com o estado atual")
+                await self.apply_snapshot(initial_containers)
+                self.initialized = True
+                return
+            
             for container_id, info in initial_containers.items():
-                container_state.update_container(container_id, info)
-            logger.info(f"Estado inicial: {len(initial_containers)} containers")
+                self.state.update_container(container_id, info)
+            logger.info(f"[{self.name}] Estado inicial: {len(initial_containers)} containers")
+            if state_store:
+                state_store.save_snapshot(self.name, self.state.containers)
+            self.sync_stats_streams()
+            self.initialized = True
         except Exception as e:
-            logger.error(f"Erro ao inicializar estado: {e}")
+            logger.error(f"[{self.name}] Erro ao inicializar estado: {e}")
+
+def parse_docker_hosts(spec: str) -> List[Tuple[str, Optional[str]]]:
+    """Converte 'nome=url,nome2=url2' em pares; vazio significa só o Docker local do ambiente"""
+    entries = [entry.strip() for entry in spec.split(',') if entry.strip()]
+    if not entries:
+        return [('local', None)]
+    hosts = []
+    for entry in entries:
+        name, _, url = entry.partition('=')
+        hosts.append((name.strip(), url.strip() or None))
+    return hosts
+
+# Daemons Docker monitorados, por nome
+print("🔧 Inicializando cliente Docker...")
+docker_hosts: Dict[str, DockerHost] = {}
+for host_name, host_url in parse_docker_hosts(DOCKER_HOSTS):
+    # Registrado mesmo fora do ar: o monitoramento reconecta quando o daemon voltar
+    docker_hosts[host_name] = DockerHost(host_name, host_url)
+    try:
+        docker_hosts[host_name].client.connect()
+        print(f"✅ Cliente Docker conectado com sucesso! ({host_name})")
+    except Exception as e:
+        print(f"❌ Erro ao conectar Docker ({host_name}): {e} - nova tentativa a cada {EVENTS_RECONNECT_DELAY:g}s")
+
+def monitoring_active() -> bool:
+    return bool(docker_hosts) and all(host.monitor.is_running() for host in docker_hosts.values())
+
+def monitored_container_count() -> int:
+    return sum(len(host.state.containers) for host in docker_hosts.values())
+
+def cached_container_stats() -> Dict[str, dict]:
+    """Stats em memória de todos os hosts, por nome de exibição"""
+    snapshot = {}
+    for host in docker_hosts.values():
+        snapshot.update(host.cached_container_stats())
+    return snapshot
+
+async def get_detailed_container_info():
+    """Listagem detalhada de todos os hosts, coletada em paralelo"""
+    if not docker_hosts:
+        return "❌ Cliente Docker não disponível"
+    
+    hosts = list(docker_hosts.values())
+    results = await asyncio.gather(*(host.docker.get_detailed_container_info() for host in hosts))
+    if len(hosts) == 1:
+        return results[0]
+    
+    merged, errors = [], []
+    for host, result in zip(hosts, results):
+        if isinstance(result, str):
+            logger.warning(f"[{host.name}] {result}")
+            errors.append(f"{host.name}: {result}")
+        else:
+            merged.extend(result)
+    if errors and not merged:
+        return "\n".join(errors)
+    return merged
+
+def find_container_id(container_name: str) -> Optional[Tuple[DockerHost, str]]:
+    """Procura um container pelo nome (ou host/nome) no ContainerState, sem chamar o Docker"""
+    host_name, _, name = container_name.rpartition('/')
+    for host in docker_hosts.values():
+        if host_name and host.name != host_name:
+            continue
+        for container_id, info in host.state.containers.items():
+            if info['name'] == name:
+                return host, container_id
+    return None
+
+async def find_container(container_name: str):
+    """Localiza um container pelo nome (ou host/nome) em todos os hosts
+
+    Usa o ContainerState para saber em qual host procurar; se o nome não
+    estiver lá, consulta todos os hosts em paralelo.
+    """
+    host_name, _, name = container_name.rpartition('/')
+    if host_name:
+        if host_name not in docker_hosts:
+            raise docker.errors.NotFound(f"Host {host_name} não configurado")
+        host = docker_hosts[host_name]
+        return host, await host.docker.get_container(name)
+    
+    known = find_container_id(name)
+    if known:
+        host = known[0]
+        return host, await host.docker.get_container(name)
+    
+    hosts = list(docker_hosts.values())
+    results = await asyncio.gather(*(host.docker.get_container(name) for host in hosts), return_exceptions=True)
+    for host, result in zip(hosts, results):
+        if not isinstance(result, Exception):
+            return host, result
+    for result in results:
+        if not isinstance(result, docker.errors.NotFound):
+            raise result
+    raise docker.errors.NotFound(f"Container {name} não encontrado")
+
+def parse_duration(text: str) -> Optional[int]:
+    """Converte '30m', '24h', '7d' em segundos"""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    try:
+        if text[-1].lower() in units:
+            return int(float(text[:-1]) * units[text[-1].lower()])
+        return int(float(text) * 60)
+    except (ValueError, IndexError):
+        return None
+
+def container_metric_values(stats: dict) -> Dict[str, float]:
+    """Extrai as métricas gravadas das stats de um container"""
+    return {metric: stats[key] for metric, key in CONTAINER_METRICS.items()}
+
+class AlertRule:
+    """Regra `alvo.métrica>limite[:duração]`, `<` para limite inferior ou `~z` para anomalia
+
+    O alvo é `host`, `*` (todos os containers) ou o nome de um container. Em
+    `~`, o valor comparado é o z-score da amostra contra uma linha de base
+    EWMA da própria série.
+    """
+    PATTERN = re.compile(r'^(?P<target>[^.\s]+)\.(?P<metric>\w+)\s*(?P<op>[<>~])\s*(?P<threshold>[\d.]+)(?::(?P<duration>\w+))?$')
+
+    def __init__(self, text: str):
+        match = self.PATTERN.match(text.strip())
+        if not match:
+            raise ValueError(f"regra inválida: {text}")
+        self.text = text.strip()
+        self.target = match['target']
+        self.series = metric_series(self.target)
+        self.metric = match['metric']
+        self.op = match['op']
+        self.threshold = float(match['threshold'])
+        self.duration = parse_duration(match['duration']) if match['duration'] else 0
+        if self.duration is None:
+            raise ValueError(f"duração inválida: {text}")
+        if self.metric not in (HOST_METRICS if self.series == HOST_SERIES else CONTAINER_METRICS):
+            raise ValueError(f"métrica desconhecida: {text}")
+        
+        # Histerese: o alerta só é resolvido depois de recuar além deste valor
+        margin = self.threshold * ALERT_HYSTERESIS
+        self.clear = self.threshold + margin if self.op == '<' else self.threshold - margin
+
+    def matches(self, series: str) -> bool:
+        if self.target == '*':
+            return series != HOST_SERIES
+        return self.series == series
+
+    def breached(self, score: float) -> bool:
+        return score < self.threshold if self.op == '<' else score > self.threshold
+
+    def cleared(self, score: float) -> bool:
+        return score > self.clear if self.op == '<' else score < self.clear
+
+class AlertState:
+    """Estado de uma regra para uma série, atualizado em O(1) a cada amostra"""
+    __slots__ = ('pending_since', 'firing', 'notified', 'last_notified', 'mean', 'var', 'count')
+
+    def __init__(self):
+        self.pending_since: Optional[float] = None
+        self.firing = False
+        self.notified = False
+        self.last_notified = float('-inf')
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+
+    def zscore(self, value: float, alpha: float) -> float:
+        """z-score da amostra contra a linha de base, que então absorve a amostra"""
+        score = (value - self.mean) / max(self.var ** 0.5, 0.1) if self.count else 0.0
+        diff = value - self.mean
+        self.mean += alpha * diff if self.count else diff
+        self.var = (1 - alpha) * (self.var + alpha * diff * diff) if self.count else 0.0
+        self.count += 1
+        return score
+
+class AlertEngine:
+    """Avalia as regras de alerta a cada amostra, sem reler o histórico
+
+    Um alerta dispara depois de a condição valer continuamente pela duração
+    da regra, resolve com histerese e notifica no máximo uma vez por
+    ALERT_COOLDOWN para a mesma regra e série (a resolução de um disparo
+    silenciado também é silenciada).
+    """
+    def __init__(self, rules: List[AlertRule], cooldown: float = ALERT_COOLDOWN,
+                 alpha: float = ALERT_EWMA_ALPHA, warmup: int = ALERT_ANOMALY_WARMUP):
+        self.rules = rules
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.warmup = warmup
+        self.states: Dict[Tuple[int, str], AlertState] = {}
+
+    def observe(self, series: str, values: Dict[str, float], now: float) -> List[dict]:
+        """Aplica uma amostra da série e retorna os alertas disparados ou resolvidos"""
+        events = []
+        for index, rule in enumerate(self.rules):
+            if rule.metric not in values or not rule.matches(series):
+                continue
+            state = self.states.get((index, series))
+            if state is None:
+                state = self.states[(index, series)] = AlertState()
+            event = self._evaluate(rule, state, values[rule.metric], now)
+            if event:
+                event.update(rule=rule, series=series, value=values[rule.metric])
+                events.append(event)
+        return events
+
+    def _evaluate(self, rule: AlertRule, state: AlertState, value: float, now: float) -> Optional[dict]:
+        score = value
+        if rule.op == '~':
+            score = state.zscore(value, self.alpha)
+            if state.count <= self.warmup:
+                return None
+        
+        if not state.firing:
+            if not rule.breached(score):
+                state.pending_since = None
+                return None
+            if state.pending_since is None:
+                state.pending_since = now
+            if now - state.pending_since < rule.duration:
+                return None
+            state.firing = True
+            state.notified = now - state.last_notified >= self.cooldown
+            if state.notified:
+                state.last_notified = now
+                return {'kind': 'firing', 'score': score, 'duration': now - state.pending_since}
+            return None
+        
+        if rule.cleared(score):
+            duration = now - state.pending_since
+            state.firing = False
+            state.pending_since = None
+            if state.notified:
+                return {'kind': 'resolved', 'score': score, 'duration': duration}
+        return None
+
+    def retain(self, series: Set[str]):
+        """Descarta o estado de séries que não existem mais"""
+        for key in [key for key in self.states if key[1] not in series]:
+            del self.states[key]
+
+    def active(self) -> List[Tuple[AlertRule, str]]:
+        return [(self.rules[index], series) for (index, series), state in self.states.items() if state.firing]
+
+def parse_alert_rules(spec: str) -> List[AlertRule]:
+    """Converte a lista de regras separadas por vírgula, ignorando as inválidas"""
+    rules = []
+    for entry in spec.split(','):
+        if not entry.strip():
+            continue
+        try:
+            rules.append(AlertRule(entry))
+        except ValueError as e:
+            print(f"❌ ALERT_RULES: {e}")
+    return rules
+
+alert_engine = AlertEngine(parse_alert_rules(ALERT_RULES))
+
+def format_alert(event: dict) -> Tuple[str, str]:
+    """Campo de embed de um alerta disparado ou resolvido"""
+    rule = event['rule']
+    value = f"{rule.metric}: {event['value']:.1f}"
+    if rule.op == '~':
+        value += f" (z = {event['score']:.1f})"
+    if event['kind'] == 'firing':
+        since = f"\nHá {format_age(event['duration'])}" if rule.duration else ""
+        return f"🚨 {series_label(event['series'])}", f"`{rule.text}`\n{value}{since}"
+    return f"✅ {series_label(event['series'])}", f"`{rule.text}`\n{value}\nDuração: {format_age(event['duration'])}"
+
+async def send_alert_notification(channel, events: List[dict]):
+    """Envia os alertas de uma avaliação para o canal, agrupados em poucas mensagens"""
+    if not channel:
+        return
+    firing = [format_alert(event) for event in events if event['kind'] == 'firing']
+    resolved = [format_alert(event) for event in events if event['kind'] == 'resolved']
+    embeds = pack_embed_fields("🚨 Alertas", discord.Color.red(), firing)
+    embeds += pack_embed_fields("✅ Alertas Resolvidos", discord.Color.green(), resolved)
+    await send_embeds(channel, embeds)
+
+class OpenMetricsWriter:
+    """Monta uma exposição no formato OpenMetrics (ou texto do Prometheus 0.0.4)"""
+    def __init__(self, openmetrics: bool = True):
+        self.openmetrics = openmetrics
+        self.lines: List[str] = []
+
+    LABEL_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+    @classmethod
+    def _labels(cls, labels: Dict[str, str]) -> str:
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{key}="{str(value).translate(cls.LABEL_ESCAPES)}"' for key, value in labels.items()) + '}'
+
+    def family(self, name: str, kind: str, help_text: str, samples):
+        """Uma família de métricas; `samples` são pares (labels, valor)"""
+        family_name = name if self.openmetrics or kind != 'counter' else f"{name}_total"
+        self.lines.append(f"# HELP {family_name} {help_text}")
+        self.lines.append(f"# TYPE {family_name} {kind}")
+        sample_name = f"{name}_total" if kind == 'counter' else name
+        for labels, value in samples:
+            self.lines.append(f"{sample_name}{self._labels(labels)} {float(value)!r}")
+
+    def render(self) -> str:
+        if self.openmetrics:
+            self.lines.append("# EOF")
+        return '\n'.join(self.lines) + '\n'
+
+def render_metrics(openmetrics: bool = True) -> str:
+    """Exposição das métricas a partir do que já está em memória, sem chamadas ao Docker"""
+    writer = OpenMetricsWriter(openmetrics)
+    mb = 1024 * 1024
+    
+    containers, stats = [], []
+    for host in docker_hosts.values():
+        for container_id, info in list(host.state.containers.items()):
+            labels = {'host': host.name, 'container': info['name'], 'image': info['image']}
+            containers.append((labels, info, container_id in host.state.flapping))
+            container_stats = host.stats_engine.get(container_id) if host.stats_engine and info.get('status') == 'running' else None
+            if container_stats is not None:
+                stats.append((labels, container_stats))
+    
+    writer.family('homelab_docker_host_live', 'gauge', 'Monitoramento do host Docker acompanhando o stream de eventos',
+                  [({'host': host.name}, host.state.live) for host in docker_hosts.values()])
+    writer.family('homelab_container_running', 'gauge', 'Container em execução',
+                  [(labels, info.get('status') == 'running') for labels, info, _ in containers])
+    writer.family('homelab_container_unhealthy', 'gauge', 'Healthcheck do container em estado unhealthy',
+                  [(labels, info.get('health') == 'unhealthy') for labels, info, _ in containers])
+    writer.family('homelab_container_flapping', 'gauge', 'Container em loop de reinício',
+                  [(labels, flapping) for labels, _, flapping in containers])
+    writer.family('homelab_container_cpu_percent', 'gauge', 'Uso de CPU do container em porcentagem de um núcleo',
+                  [(labels, s['cpu_percent']) for labels, s in stats])
+    writer.family('homelab_container_memory_usage_bytes', 'gauge', 'Memória usada pelo container',
+                  [(labels, s['memory_usage_mb'] * mb) for labels, s in stats])
+    writer.family('homelab_container_memory_limit_bytes', 'gauge', 'Limite de memória do container',
+                  [(labels, s['memory_limit_mb'] * mb) for labels, s in stats])
+    writer.family('homelab_container_network_receive_bytes', 'counter', 'Bytes recebidos pelo container',
+                  [(labels, s['network_rx_mb'] * mb) for labels, s in stats])
+    writer.family('homelab_container_network_transmit_bytes', 'counter', 'Bytes enviados pelo container',
+                  [(labels, s['network_tx_mb'] * mb) for labels, s in stats])
+    
+    system_stats = host_sampler.latest
+    if system_stats:
+        writer.family('homelab_host_cpu_percent', 'gauge', 'Uso de CPU do host', [({}, system_stats['cpu_percent'])])
+        writer.family('homelab_host_memory_used_bytes', 'gauge', 'Memória usada no host', [({}, system_stats['memory'].used)])
+        writer.family('homelab_host_memory_total_bytes', 'gauge', 'Memória total do host', [({}, system_stats['memory'].total)])
+        writer.family('homelab_host_swap_used_bytes', 'gauge', 'Swap usada no host', [({}, system_stats['swap'].used)])
+        writer.family('homelab_host_disk_used_bytes', 'gauge', 'Espaço usado em /', [({}, system_stats['disk'].used)])
+        writer.family('homelab_host_disk_total_bytes', 'gauge', 'Tamanho de /', [({}, system_stats['disk'].total)])
+        writer.family('homelab_host_load_average', 'gauge', 'Load average do host',
+                      [({'period': period}, value) for period, value in zip(('1m', '5m', '15m'), system_stats['load_avg'])])
+        writer.family('homelab_host_network_receive_bytes', 'counter', 'Bytes recebidos pelo host', [({}, system_stats['net'].bytes_recv)])
+        writer.family('homelab_host_network_transmit_bytes', 'counter', 'Bytes enviados pelo host', [({}, system_stats['net'].bytes_sent)])
+        writer.family('homelab_host_uptime_seconds', 'gauge', 'Tempo desde o boot do host', [({}, system_stats['uptime'])])
+    
+    writer.family('homelab_alerts_firing', 'gauge', 'Alertas disparados no momento', [({}, len(alert_engine.active()))])
+    return writer.render()
+
+class MetricsExporter:
+    """Endpoint HTTP /metrics para o Prometheus, servido pelo event loop do bot"""
+    OPENMETRICS_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+    TEXT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self, port: int, bind: str = METRICS_EXPORTER_BIND):
+        self.port = port
+        self.bind = bind
+        self.runner: Optional[web.AppRunner] = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        openmetrics = 'application/openmetrics-text' in request.headers.get('Accept', '')
+        body = render_metrics(openmetrics)
+        return web.Response(body=body.encode(), headers={'Content-Type': self.OPENMETRICS_TYPE if openmetrics else self.TEXT_TYPE})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.bind, self.port).start()
+        logger.info(f"Métricas expostas em http://{self.bind}:{self.port}/metrics")
+
+    async def close(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+metrics_exporter = MetricsExporter(METRICS_EXPORTER_PORT) if METRICS_EXPORTER_PORT else None
+
+@tasks.loop(seconds=HOST_SAMPLE_INTERVAL)
+async def sample_host_metrics():
+    """Task que atualiza a amostra de métricas do host em segundo plano"""
+    with perf.timer('psutil', 'sample'):
+        await asyncio.get_running_loop().run_in_executor(None, host_sampler.sample)
+
+@tasks.loop(seconds=METRICS_RECORD_INTERVAL)
+async def record_metrics():
+    """Task que grava no histórico as últimas amostras já coletadas"""
+    now = time.time()
+    for name, stats in cached_container_stats().items():
+        metrics_store.record(name, container_metric_values(stats), now)
+    
+    if host_sampler.latest:
+        metrics_store.record(HOST_SERIES, host_metric_values(host_sampler.latest), now)
+    
+    try:
+        await metrics_store.flush()
+    except Exception as e:
+        logger.error(f"Erro ao gravar métricas: {e}")
+
+@tasks.loop(seconds=STATE_FLUSH_INTERVAL)
+async def flush_state():
+    """Task que grava em lote a configuração, os snapshots e o histórico pendentes"""
+    try:
+        await state_store.flush()
+    except Exception as e:
+        logger.error(f"Erro ao gravar estado: {e}")
+
+@tasks.loop(seconds=ALERT_INTERVAL)
+async def evaluate_alerts():
+    """Task que avalia as regras de alerta com as amostras já coletadas
+
+    Usa a última amostra do host e o cache dos streams de stats; sem
+    STATS_STREAMING só as regras do host são avaliadas.
+    """
+    now = time.time()
+    events = []
+    if host_sampler.latest:
+        events += alert_engine.observe(HOST_SERIES, host_metric_values(host_sampler.latest), now)
+    for name, stats in cached_container_stats().items():
+        events += alert_engine.observe(name, container_metric_values(stats), now)
+    
+    # Séries de containers removidos perdem o estado; containers parados mantêm
+    alert_engine.retain({HOST_SERIES} | {display_name(info) for host in docker_hosts.values() for info in list(host.state.containers.values())})
+    
+    if events:
+        logger.info(f"Alertas: {len(events)} mudanças")
+        if state_store:
+            for event in events:
+                state_store.record_event(f"alert_{event['kind']}", None, series_label(event['series']),
+                                         f"{event['rule'].text} ({event['value']:.1f})")
+        for channel in deploy_channels():
+            await send_alert_notification(channel, events)
+
+@tasks.loop(seconds=30)
+async def check_flapping():
+    """Task que avisa quando containers em loop de reinício ficam estáveis"""
+    for host in docker_hosts.values():
+        stabilized = host.state.check_stability()
+        if stabilized:
+            notification_queue.enqueue({'stabilized': stabilized})
+
+@tasks.loop(seconds=RING_BUFFER_INTERVAL)
+async def buffer_recent_metrics():
+    """Task que copia as amostras do cache de streaming para os ring buffers"""
+    now = time.time()
+    known_ids = set()
+    for host in docker_hosts.values():
+        known_ids.update(host.state.containers)
+        if not host.stats_engine:
+            continue
+        for container_id, info in list(host.state.containers.items()):
+            if info.get('status') == 'running':
+                stats = host.stats_engine.get(container_id)
+                if stats is not None:
+                    recent_metrics.record(container_id, stats, now)
+    recent_metrics.retain(known_ids)
 
 @bot.event
 async def on_ready():
     print(f'🤖 Bot conectado como {bot.user}')
     
-    # Testar conexão com Docker
-    if docker_client:
+    if not sample_host_metrics.is_running():
+        sample_host_metrics.start()
+    
+    if metrics_store and not record_metrics.is_running():
+        record_metrics.start()
+    
+    if state_store and not flush_state.is_running():
+        flush_state.start()
+    
+    if STATS_STREAMING and docker_hosts and not buffer_recent_metrics.is_running():
+        buffer_recent_metrics.start()
+    
+    if docker_hosts and not check_flapping.is_running():
+        check_flapping.start()
+    
+    if alert_engine.rules and not evaluate_alerts.is_running():
+        evaluate_alerts.start()
+    
+    # Testar conexão com cada Docker e iniciar o monitoramento de cada um
+    for host in docker_hosts.values():
         try:
-            docker_client.ping()
-            print('✅ Conexão com Docker confirmada!')
-            
-            # Iniciar monitoramento
-            if not monitor_containers.is_running():
-                monitor_containers.start()
-                print('📡 Monitoramento de containers iniciado!')
+            await host.docker.ping()
+            print(f'✅ Conexão com Docker confirmada! ({host.name})')
         except Exception as e:
-            print(f'❌ Erro na verificação do Docker: {e}')
-    else:
+            print(f'❌ Erro na verificação do Docker ({host.name}): {e}')
+        
+        # Também para hosts fora do ar: cada iteração do monitoramento tenta reconectar
+        if not host.monitor.is_running():
+            host.monitor.start()
+            print(f'📡 Monitoramento de containers iniciado! ({host.name})')
+    
+    if not docker_hosts:
         print('❌ Cliente Docker não disponível')
     
-    # Verificar canal de deploy
-    if DEPLOY_CHANNEL_ID:
-        channel = bot.get_channel(DEPLOY_CHANNEL_ID)
-        if channel:
-            print(f'✅ Canal de deploy configurado: #{channel.name}')
-        else:
+    # Verificar canais de deploy
+    channels = deploy_channels()
+    for channel in channels:
+        print(f'✅ Canal de deploy configurado: #{channel.name}')
+    if not channels:
+        if DEPLOY_CHANNEL_ID:
             print(f'⚠️ Canal de deploy não encontrado (ID: {DEPLOY_CHANNEL_ID})')
+        else:
+            print('⚠️ Canal de deploy não configurado (DEPLOY_CHANNEL_ID ou !set_deploy_channel)')
+
+class ContainerNameIndex:
+    """Nomes de containers para o autocomplete dos slash commands
+
+    Vem do ContainerState de cada host, sem chamadas ao Docker, e só é
+    reconstruído quando algum estado muda; cada tecla digitada é uma busca
+    em uma lista ordenada já pronta.
+    """
+    def __init__(self):
+        self.version = None
+        self.names: List[str] = []
+        self.projects: List[str] = []
+
+    def refresh(self):
+        version = tuple((host.name, host.state.last_update) for host in docker_hosts.values())
+        if version == self.version:
+            return
+        names, projects = set(), set()
+        for host in docker_hosts.values():
+            for info in list(host.state.containers.values()):
+                names.add(display_name(info))
+                project = (info.get('labels') or {}).get(COMPOSE_PROJECT_LABEL)
+                if project:
+                    projects.add(project)
+        self.names = sorted(names)
+        self.projects = sorted(projects)
+        self.version = version
+
+    @staticmethod
+    def search(current: str, candidates: List[str], limit: int = 25) -> List[str]:
+        """Quem começa com o texto digitado primeiro, depois quem o contém"""
+        current = current.lower()
+        matches = [name for name in candidates if name.lower().startswith(current)]
+        if len(matches) < limit:
+            matches += [name for name in candidates if current in name.lower() and not name.lower().startswith(current)]
+        return matches[:limit]
+
+container_index = ContainerNameIndex()
+
+def autocomplete_choices(values: List[str]) -> List[app_commands.Choice[str]]:
+    return [app_commands.Choice(name=value, value=value) for value in values if len(value) <= 100]
+
+async def container_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    container_index.refresh()
+    return autocomplete_choices(container_index.search(current, container_index.names))
+
+async def series_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    container_index.refresh()
+    return autocomplete_choices(container_index.search(current, ['host'] + [f'/{name}' if name == 'host' else name for name in container_index.names]))
+
+async def metric_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    metrics = HOST_METRICS if metric_series(getattr(interaction.namespace, 'series', None) or '') == HOST_SERIES else tuple(CONTAINER_METRICS)
+    return autocomplete_choices(ContainerNameIndex.search(current, list(metrics)))
+
+async def targets_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    """Completa o último termo de uma lista de alvos: nome de container ou valor de --project"""
+    container_index.refresh()
+    head, _, last = current.rpartition(' ')
+    tokens = head.split()
+    if tokens and tokens[-1] in ('--project', '-p'):
+        candidates = container_index.projects
     else:
-        print('⚠️ Canal de deploy não configurado (DEPLOY_CHANNEL_ID)')
+        candidates = container_index.names
+    prefix = f"{head} " if head else ""
+    return autocomplete_choices([prefix + name for name in container_index.search(last, candidates)])
 
 # ======= NOVOS COMANDOS DE MONITORAMENTO DE DEPLOY =======
 
-@bot.command(name='deploy_status', aliases=['deploys'])
+@bot.hybrid_command(name='deploy_status', aliases=['deploys'])
 async def deploy_status(ctx):
     """Mostra status do monitoramento de deploy"""
     embed = discord.Embed(title="📡 Status do Monitoramento", color=discord.Color.blue())
     
     # Status do monitoramento
-    monitor_status = "✅ Ativo" if monitor_containers.is_running() else "❌ Inativo"
+    monitor_status = "✅ Ativo" if monitoring_active() else "❌ Inativo"
     embed.add_field(name="Monitoramento", value=monitor_status, inline=True)
     
     # Canal de notificações
-    if DEPLOY_CHANNEL_ID:
-        channel = bot.get_channel(DEPLOY_CHANNEL_ID)
-        channel_info = f"#{channel.name}" if channel else f"❌ Canal não encontrado (ID: {DEPLOY_CHANNEL_ID})"
+    channel_id = deploy_channel_id(ctx.guild.id if ctx.guild else None)
+    if channel_id:
+        channel = bot.get_channel(channel_id)
+        channel_info = f"#{channel.name}" if channel else f"❌ Canal não encontrado (ID: {channel_id})"
     else:
         channel_info = "❌ Não configurado"
     embed.add_field(name="Canal de Notificações", value=channel_info, inline=True)
     
     # Estatísticas
-    embed.add_field(name="Containers Monitorados", value=len(container_state.containers), inline=True)
-    embed.add_field(name="Última Atualização", value=container_state.last_update.strftime("%H:%M:%S"), inline=True)
+    embed.add_field(name="Containers Monitorados", value=monitored_container_count(), inline=True)
+    if docker_hosts:
+        last_update = max(host.state.last_update for host in docker_hosts.values())
+        embed.add_field(name="Última Atualização", value=last_update.strftime("%H:%M:%S"), inline=True)
     
     # Docker status
-    docker_status = "✅ Conectado" if docker_client else "❌ Desconectado"
+    if len(docker_hosts) > 1:
+        docker_status = "\n".join(
+            f"{'✅' if host.state.live else '⚠️'} {host.name}: {len(host.state.containers)} containers"
+            for host in docker_hosts.values()
+        )
+    else:
+        docker_status = "✅ Conectado" if docker_hosts else "❌ Desconectado"
     embed.add_field(name="Docker", value=docker_status, inline=True)
     
     await ctx.send(embed=embed)
 
-@bot.command(name='recent_changes', aliases=['changes'])
+@bot.hybrid_command(name='recent_changes', aliases=['changes'])
 async def recent_changes(ctx, minutes: int = 60):
     """Mostra mudanças recentes nos containers"""
-    if not docker_client:
+    if not docker_hosts:
         await ctx.send("❌ Cliente Docker não disponível")
         return
     
@@ -501,15 +2561,8 @@ async def recent_changes(ctx, minutes: int = 60):
     try:
         # Obter containers com filtro de tempo
         since_time = datetime.now() - timedelta(minutes=minutes)
-        containers = docker_client.containers.list(all=True)
-        
-        recent_containers = []
-        for container in containers:
-            created_str = container.attrs['Created']
-            created_time = datetime.fromisoformat(created_str.replace('Z', '+00:00')).replace(tzinfo=None)
-            
-            if created_time > since_time:
-                recent_containers.append(get_container_info(container))
+        results = await asyncio.gather(*(host.docker.get_recent_containers_info(since_time) for host in docker_hosts.values()))
+        recent_containers = [container for result in results for container in result]
         
         if not recent_containers:
             await ctx.send(f"📭 Nenhuma mudança detectada nos últimos {minutes} minutos")
@@ -526,7 +2579,7 @@ async def recent_changes(ctx, minutes: int = 60):
             time_ago = datetime.now() - created_time
             
             embed.add_field(
-                name=f"📦 {container['name']}",
+                name=f"📦 {display_name(container)}",
                 value=f"Status: {container['status']}\nImagem: `{container['image']}`\nCriado: {int(time_ago.total_seconds() / 60)} min atrás",
                 inline=False
             )
@@ -551,19 +2604,61 @@ async def set_deploy_channel(ctx, channel_id: int = None):
         await ctx.send(f"❌ Canal com ID {channel_id} não encontrado")
         return
     
-    # Aqui você deveria salvar o channel_id em um arquivo de configuração ou banco de dados
-    # Por simplicidade, estou apenas informando como fazer
-    await ctx.send(f"✅ Canal de deploy configurado para #{channel.name}\n"
-                   f"💡 Adicione `DEPLOY_CHANNEL_ID={channel_id}` ao seu arquivo .env e reinicie o bot")
+    # A configuração é por servidor: só vale canal do próprio servidor
+    if ctx.guild is None or getattr(getattr(channel, 'guild', None), 'id', None) != ctx.guild.id:
+        await ctx.send("❌ O canal precisa ser deste servidor")
+        return
+    
+    if not state_store:
+        await ctx.send(f"✅ Canal de deploy configurado para #{channel.name}\n"
+                       f"💡 Sem STATE_DB_PATH nada é salvo: adicione `DEPLOY_CHANNEL_ID={channel_id}` ao seu arquivo .env e reinicie o bot")
+        return
+    
+    state_store.set(ctx.guild.id, 'deploy_channel_id', str(channel_id))
+    await state_store.flush()
+    await ctx.send(f"✅ Canal de deploy configurado para #{channel.name}")
+
+# Ícones do histórico, por tipo de evento
+EVENT_EMOJIS = {
+    'created': "🚀", 'removed': "🗑️", 'restarted': "🔄", 'status_changed': "⚡", 'health_changed': "🩺",
+    'flapping': "🔁", 'stabilized': "🟢", 'alert_firing': "🚨", 'alert_resolved': "✅"
+}
+
+@bot.hybrid_command(name='notifications', aliases=['notif'])
+async def notifications(ctx, period: str = '24h'):
+    """Histórico de notificações de deploy e alertas enviados"""
+    if not state_store:
+        await ctx.send("❌ Histórico desativado (STATE_DB_PATH vazio)")
+        return
+    
+    seconds = parse_duration(period)
+    if not seconds:
+        await ctx.send("❌ Período inválido. Use algo como `30m`, `6h` ou `7d`")
+        return
+    
+    await state_store.flush()
+    events = await state_store.events(time.time() - seconds)
+    if not events:
+        await ctx.send(f"📭 Nenhuma notificação nas últimas {period}")
+        return
+    
+    lines = []
+    for ts, kind, host, name, detail in events:
+        where = f"{host}/{name}" if host and len(docker_hosts) > 1 else name
+        lines.append(f"`{datetime.fromtimestamp(ts).strftime('%d/%m %H:%M')}` {EVENT_EMOJIS.get(kind, '•')} **{where}** {detail}")
+    embed = discord.Embed(title=f"🗒️ Notificações ({period})", description=fit_field([line + "\n" for line in lines], 4096, "use um período menor"),
+                          color=discord.Color.blue())
+    embed.set_footer(text=f"{len(events)} mais recentes")
+    await ctx.send(embed=embed)
 
 # ======= COMANDOS DE MONITORAMENTO BÁSICO (mantidos) =======
 
-@bot.command(name='status')
+@bot.hybrid_command(name='status')
 async def status(ctx):
     """Mostra o status de todos os containers"""
     await ctx.send("🔍 Verificando containers...")
     
-    containers = get_detailed_container_info()
+    containers = await get_detailed_container_info()
     
     if isinstance(containers, str):
         await ctx.send(containers)
@@ -580,15 +2675,11 @@ async def status(ctx):
     embed = discord.Embed(title="📊 Status dos Containers", color=discord.Color.blue())
     
     if running:
-        running_text = ""
-        for container in running:
-            stats = container['stats']
-            running_text += f"🟢 `{container['name']}`\n"
-            running_text += f"   CPU: {stats['cpu_percent']}% | RAM: {stats['memory_usage_mb']}MB ({stats['memory_percent']:.1f}%)\n"
+        running_text = fit_field([f"🟢 `{display_name(c)}`\n{format_stats_line(c['stats'])}" for c in running])
         embed.add_field(name="Containers Rodando", value=running_text, inline=False)
     
     if stopped:
-        stopped_text = "\n".join([f"🔴 `{c['name']}` - {c['status']}" for c in stopped])
+        stopped_text = fit_field([f"🔴 `{display_name(c)}` - {c['status']}\n" for c in stopped])
         embed.add_field(name="Containers Parados", value=stopped_text, inline=False)
     
     embed.add_field(
@@ -601,18 +2692,19 @@ async def status(ctx):
 
 # ======= NOVOS COMANDOS DE MONITORAMENTO AVANÇADO =======
 
-@bot.command(name='resources', aliases=['res', 'stats'])
+@bot.hybrid_command(name='resources', aliases=['res', 'stats'])
+@app_commands.autocomplete(container_name=container_autocomplete)
 async def resources(ctx, container_name: str = None):
     """Mostra recursos detalhados de um container específico ou todos"""
     if container_name:
         # Mostrar recursos de um container específico
-        if not docker_client:
+        if not docker_hosts:
             await ctx.send("❌ Cliente Docker não disponível")
             return
         
         try:
-            container = docker_client.containers.get(container_name)
-            stats = get_container_stats(container)
+            host, container = await find_container(container_name)
+            stats = await host.docker.get_container_stats(container)
             
             embed = discord.Embed(
                 title=f"📈 Recursos - {container_name}",
@@ -633,13 +2725,15 @@ async def resources(ctx, container_name: str = None):
             
         except docker.errors.NotFound:
             await ctx.send(f"❌ Container `{container_name}` não encontrado")
+        except asyncio.TimeoutError:
+            await ctx.send(f"⏰ Docker não respondeu a tempo para `{container_name}`")
         except Exception as e:
             await ctx.send(f"❌ Erro: {str(e)}")
     else:
         # Mostrar resumo de recursos de todos os containers
         await ctx.send("📊 Coletando estatísticas...")
         
-        containers = get_detailed_container_info()
+        containers = await get_detailed_container_info()
         
         if isinstance(containers, str):
             await ctx.send(containers)
@@ -657,23 +2751,20 @@ async def resources(ctx, container_name: str = None):
         
         embed = discord.Embed(title="📈 Recursos dos Containers", color=discord.Color.blue())
         
-        resources_text = ""
-        for container in sorted(running_containers, key=lambda x: x['stats']['cpu_percent'], reverse=True):
-            stats = container['stats']
-            resources_text += f"🔹 **{container['name']}**\n"
-            resources_text += f"   CPU: {stats['cpu_percent']}% | RAM: {stats['memory_usage_mb']}MB ({stats['memory_percent']:.1f}%)\n"
+        resources_text = fit_field([f"🔹 **{display_name(c)}**\n{format_stats_line(c['stats'])}"
+                                    for c in sorted(running_containers, key=lambda x: x['stats']['cpu_percent'], reverse=True)])
         
         embed.add_field(name="Por Container", value=resources_text, inline=False)
         embed.add_field(name="Total", value=f"CPU: {total_cpu:.1f}% | RAM: {total_ram_mb:.0f} MB", inline=False)
         
         await ctx.send(embed=embed)
 
-@bot.command(name='top')
+@bot.hybrid_command(name='top')
 async def top_resources(ctx, limit: int = 5):
     """Mostra os containers que mais consomem recursos"""
     await ctx.send("🔍 Analisando consumo de recursos...")
     
-    containers = get_detailed_container_info()
+    containers = await get_detailed_container_info()
     
     if isinstance(containers, str):
         await ctx.send(containers)
@@ -694,21 +2785,19 @@ async def top_resources(ctx, limit: int = 5):
     
     cpu_text = ""
     for i, container in enumerate(top_cpu, 1):
-        cpu_text += f"{i}. **{container['name']}** - {container['stats']['cpu_percent']}%\n"
+        cpu_text += f"{i}. **{display_name(container)}** - {container['stats']['cpu_percent']}%{stale_marker(container['stats'])}\n"
     embed.add_field(name="🔥 CPU", value=cpu_text, inline=True)
     
     ram_text = ""
     for i, container in enumerate(top_ram, 1):
-        ram_text += f"{i}. **{container['name']}** - {container['stats']['memory_usage_mb']} MB\n"
+        ram_text += f"{i}. **{display_name(container)}** - {container['stats']['memory_usage_mb']} MB{stale_marker(container['stats'])}\n"
     embed.add_field(name="🧠 RAM", value=ram_text, inline=True)
     
     await ctx.send(embed=embed)
 
-@bot.command(name='system', aliases=['host'])
+@bot.hybrid_command(name='system', aliases=['host'])
 async def system_info(ctx):
     """Mostra informações do sistema host"""
-    await ctx.send("🖥️ Coletando informações do sistema...")
-    
     try:
         system_stats = get_system_stats()
         
@@ -718,6 +2807,9 @@ async def system_info(ctx):
         
         memory = system_stats['memory']
         disk = system_stats['disk']
+        swap = system_stats['swap']
+        load_1, load_5, load_15 = system_stats['load_avg']
+        net_rates = system_stats['net_rates']
         uptime_hours = system_stats['uptime'] / 3600
         
         embed = discord.Embed(title="🖥️ Sistema Host", color=discord.Color.purple())
@@ -728,15 +2820,287 @@ async def system_info(ctx):
         embed.add_field(name="Uptime", value=f"{uptime_hours:.1f} horas", inline=True)
         embed.add_field(name="RAM Livre", value=f"{bytes_to_gb(memory.available):.1f} GB", inline=True)
         embed.add_field(name="Disco Livre", value=f"{bytes_to_gb(disk.free):.1f} GB", inline=True)
+        embed.add_field(name="Swap", value=f"{bytes_to_gb(swap.used):.1f} GB / {bytes_to_gb(swap.total):.1f} GB ({swap.percent}%)", inline=True)
+        embed.add_field(name="Load Average", value=f"{load_1:.2f} / {load_5:.2f} / {load_15:.2f}", inline=True)
+        embed.add_field(name="Núcleos", value=" ".join(f"{core:.0f}%" for core in system_stats['cpu_per_core']), inline=True)
+        embed.add_field(name="Rede", value=f"⬇️ {bytes_to_mb(net_rates['rx_bytes_per_s'])} MB/s | ⬆️ {bytes_to_mb(net_rates['tx_bytes_per_s'])} MB/s", inline=True)
+        
+        embed.set_footer(text=f"Amostra de {system_stats['sampled_at'].strftime('%H:%M:%S')}")
         
         await ctx.send(embed=embed)
         
     except Exception as e:
         await ctx.send(f"❌ Erro ao obter informações do sistema: {str(e)}")
 
+SPARKLINE_BLOCKS = "▁▂▃▄▅▆▇█"
+
+def sparkline(values: List[float]) -> str:
+    """Mini gráfico em texto de uma série de valores"""
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    scale = (high - low) or 1
+    return "".join(SPARKLINE_BLOCKS[int((v - low) / scale * (len(SPARKLINE_BLOCKS) - 1))] for v in values)
+
+@bot.hybrid_command(name='history', aliases=['hist'])
+@app_commands.autocomplete(series=series_autocomplete, metric=metric_autocomplete)
+async def history(ctx, series: str = None, metric: str = 'cpu', period: str = '1h'):
+    """Mostra o histórico de uma métrica de um container ou do host"""
+    if not metrics_store:
+        await ctx.send("❌ Histórico de métricas desativado (METRICS_DB_PATH)")
+        return
+    
+    if not series:
+        await ctx.send("❌ Especifique o container: `!history nome_do_container [métrica] [período]`")
+        return
+    
+    valid_metrics = HOST_METRICS if metric_series(series) == HOST_SERIES else tuple(CONTAINER_METRICS)
+    if metric not in valid_metrics:
+        await ctx.send(f"❌ Métrica inválida. Use: {', '.join(f'`{m}`' for m in valid_metrics)}")
+        return
+    
+    seconds = parse_duration(period)
+    if not seconds or seconds <= 0:
+        await ctx.send("❌ Período inválido. Exemplos: `30m`, `24h`, `7d`")
+        return
+    
+    try:
+        rows = await metrics_store.query(metric_series(series), metric, time.time() - seconds)
+    except Exception as e:
+        await ctx.send(f"❌ Erro ao consultar histórico: {str(e)}")
+        return
+    
+    if not rows:
+        await ctx.send(f"📭 Sem dados de `{metric}` para `{series}` em {period}")
+        return
+    
+    averages = [row[1] for row in rows]
+    embed = discord.Embed(title=f"📉 Histórico - {series} ({metric}, {period})", color=discord.Color.blue())
+    embed.add_field(name="Mínimo", value=f"{min(row[2] for row in rows):.2f}", inline=True)
+    embed.add_field(name="Média", value=f"{sum(averages) / len(averages):.2f}", inline=True)
+    embed.add_field(name="Máximo", value=f"{max(row[3] for row in rows):.2f}", inline=True)
+    embed.add_field(name="Tendência", value=f"`{sparkline(averages)}`", inline=False)
+    embed.set_footer(text=f"{datetime.fromtimestamp(rows[0][0]).strftime('%d/%m %H:%M')} → {datetime.fromtimestamp(rows[-1][0]).strftime('%d/%m %H:%M')}")
+    
+    await ctx.send(embed=embed)
+
+@bot.hybrid_command(name='trend')
+@app_commands.autocomplete(container_name=container_autocomplete)
+async def trend(ctx, container_name: str = None, period: str = '30m'):
+    """Mostra min/média/p95/máx recentes de um container a partir da memória"""
+    if not container_name:
+        await ctx.send("❌ Especifique o container: `!trend nome_do_container [período]`")
+        return
+    
+    seconds = parse_duration(period)
+    if not seconds or seconds <= 0:
+        await ctx.send("❌ Período inválido. Exemplos: `15m`, `1h`, `3h`")
+        return
+    
+    found = find_container_id(container_name)
+    if found is None:
+        await ctx.send(f"❌ Container `{container_name}` não encontrado")
+        return
+    container_id = found[1]
+    
+    embed = discord.Embed(title=f"📊 Tendência - {container_name} ({period})", color=discord.Color.blue())
+    labels = {'cpu': ('CPU', '%'), 'mem': ('RAM', ' MB'), 'mem_pct': ('RAM %', '%'), 'rx': ('Rede RX', ' MB'), 'tx': ('Rede TX', ' MB')}
+    count = 0
+    for metric, (label, unit) in labels.items():
+        window = recent_metrics.window(container_id, metric, seconds)
+        if window:
+            count = window['count']
+            embed.add_field(
+                name=label,
+                value=f"min {window['min']:.1f}{unit}\nmédia {window['avg']:.1f}{unit}\np95 {window['p95']:.1f}{unit}\nmáx {window['max']:.1f}{unit}",
+                inline=True
+            )
+    
+    if not count:
+        await ctx.send(f"📭 Sem amostras recentes de `{container_name}` em memória")
+        return
+    
+    embed.set_footer(text=f"{count} amostras a cada {RING_BUFFER_INTERVAL:.0f}s • janela máxima {RING_BUFFER_HOURS:.0f}h")
+    await ctx.send(embed=embed)
+
+class StreamingReply:
+    """Resposta da IA exibida aos poucos, editando mensagens já enviadas
+
+    As edições são agrupadas (no máximo uma a cada STREAM_EDIT_INTERVAL) para
+    ficar dentro do rate limit de edição do Discord; ao passar do limite de
+    2000 caracteres (texto) ou 4096 (descrição de embed) a resposta continua em
+    uma nova mensagem.
+    """
+    CURSOR = " ▌"
+
+    def __init__(self, destination, embed: Optional[discord.Embed] = None, interval: float = STREAM_EDIT_INTERVAL):
+        self.destination = destination
+        self.template = embed
+        self.interval = interval
+        self.limit = (4096 if embed else 2000) - len(self.CURSOR)
+        self.pages: List[str] = [""]
+        self.message = None
+        self.last_edit = 0.0
+
+    def _render(self, text: str, fields=()) -> dict:
+        if self.template is None:
+            return {'content': text}
+        embed = discord.Embed(description=text, color=self.template.color)
+        if len(self.pages) == 1:
+            embed.title = self.template.title
+        for name, value, inline in fields:
+            embed.add_field(name=name, value=value, inline=inline)
+        if fields:
+            embed.timestamp = self.template.timestamp
+        return {'embed': embed}
+
+    async def start(self):
+        """Envia o placeholder imediatamente"""
+        self.message = await self.destination.send(**self._render("⏳ Pensando..."))
+        self.last_edit = time.monotonic()
+
+    async def _flush(self, final: bool = False, fields=()):
+        text = self.pages[-1] if final else self.pages[-1] + self.CURSOR
+        if self.message is None:
+            self.message = await self.destination.send(**self._render(text, fields))
+        else:
+            with perf.timer('discord', 'message.edit'):
+                await self.message.edit(**self._render(text, fields))
+        self.last_edit = time.monotonic()
+
+    async def feed(self, delta: str):
+        self.pages[-1] += delta
+        while len(self.pages[-1]) > self.limit:
+            page = self.pages[-1]
+            # Quebra na última linha inteira que cabe, se houver uma razoável
+            cut = page.rfind("\n", 0, self.limit)
+            if cut < self.limit // 2:
+                cut = self.limit
+            self.pages[-1] = page[:cut]
+            await self._flush(final=True)
+            self.pages.append(page[cut:].lstrip("\n"))
+            self.message = None
+        
+        if self.pages[-1] and time.monotonic() - self.last_edit >= self.interval:
+            await self._flush()
+
+    async def finish(self, fields=()) -> str:
+        """Faz a edição final (com campos extras no último embed) e devolve o texto completo"""
+        text = "".join(self.pages)
+        if self.pages[-1] or fields or self.message is not None:
+            if not self.pages[-1] and self.template is None:
+                # Mensagens de texto não podem ficar vazias
+                self.pages[-1] = "(sem resposta)"
+            await self._flush(final=True, fields=fields)
+        return text
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa grosseira de tokens (~4 caracteres por token)"""
+    return len(text) // 4 + 1
+
+def rank_containers_for_context(containers: List[dict], question: Optional[str] = None) -> List[dict]:
+    """Ordena por relevância: citados na pergunta, com problema, maiores consumidores, demais"""
+    mentioned = set(re.findall(r"[\w.-]+", (question or "").lower()))
+
+    def rank(container):
+        stats = container['stats']
+        if container['name'].lower() in mentioned:
+            tier = 0
+        elif container.get('health') == 'unhealthy' or container['status'] in ('restarting', 'dead') or stats.get('stale'):
+            tier = 1
+        elif container['status'] == 'running':
+            tier = 2
+        else:
+            tier = 3
+        return tier, -(stats.get('cpu_percent', 0) + stats.get('memory_percent', 0))
+
+    return sorted(containers, key=rank)
+
+def build_ai_context(containers: List[dict], system_stats: Optional[dict] = None, question: Optional[str] = None,
+                     budget: int = AI_CONTEXT_TOKEN_BUDGET) -> str:
+    """Contexto compacto (tabela) de containers e host dentro de um orçamento de tokens
+
+    Os containers mais relevantes entram primeiro; o que não couber é resumido
+    em uma linha de contagem no final.
+    """
+    running = [c for c in containers if c['status'] == 'running']
+    lines = [
+        f"resumo: {len(containers)} containers, {len(running)} rodando, {len(containers) - len(running)} parados, "
+        f"CPU total {sum(c['stats']['cpu_percent'] for c in running):.1f}%, "
+        f"RAM total {sum(c['stats']['memory_usage_mb'] for c in running):.0f}MB"
+    ]
+    
+    if system_stats and 'error' not in system_stats:
+        memory, disk = system_stats['memory'], system_stats['disk']
+        host = (f"host: cpu {system_stats['cpu_percent']:.0f}% | ram {bytes_to_gb(memory.used):.1f}/{bytes_to_gb(memory.total):.1f}GB ({memory.percent:.0f}%)"
+                f" | disco {disk.percent:.0f}% | uptime {system_stats['uptime'] / 3600:.0f}h")
+        if 'load_avg' in system_stats:
+            host += f" | load {system_stats['load_avg'][0]:.2f} | swap {system_stats['swap'].percent:.0f}%"
+        lines.append(host)
+    
+    lines.append("nome|status|saude|cpu%|ram_mb|ram%|imagem")
+    used = estimate_tokens("\n".join(lines))
+    ranked = rank_containers_for_context(containers, question)
+    
+    for included, container in enumerate(ranked):
+        stats = container['stats']
+        row = "|".join([
+            display_name(container),
+            container['status'],
+            container.get('health') or "-",
+            "?" if stats.get('stale') else f"{stats['cpu_percent']:.1f}",
+            f"{stats['memory_usage_mb']:.0f}",
+            f"{stats['memory_percent']:.1f}",
+            container['image']
+        ])
+        cost = estimate_tokens(row)
+        if used + cost > budget:
+            omitted = ranked[included:]
+            lines.append(f"... +{len(omitted)} containers omitidos "
+                         f"({len([c for c in omitted if c['status'] == 'running'])} rodando, baixo consumo)")
+            break
+        lines.append(row)
+        used += cost
+    
+    return "\n".join(lines)
+
+def format_age(seconds: float) -> str:
+    return f"{seconds:.0f}s" if seconds < 60 else f"{seconds / 60:.0f} min"
+
+async def stream_ai_reply(destination, messages: list, max_tokens: int, embed: Optional[discord.Embed] = None,
+                          fields=(), cache_key: Optional[str] = None) -> str:
+    """Envia uma resposta da Groq em streaming para o destino
+
+    Com cache_key, uma resposta recente em cache é enviada de imediato, com
+    a indicação da idade, sem chamar a API.
+    """
+    cached = ai_cache.get(cache_key) if cache_key else None
+    if cached:
+        text, age = cached
+        marker = f"🗃️ Resposta em cache (há {format_age(age)})"
+        reply = StreamingReply(destination, embed=embed, interval=float('inf'))
+        if embed is None:
+            await reply.feed(f"*{marker}*\n")
+            await reply.feed(text)
+            await reply.finish()
+        else:
+            await reply.feed(text)
+            await reply.finish(fields=[*fields, ("🗃️ Cache", f"Resposta de {format_age(age)} atrás", False)])
+        return text
+    
+    reply = StreamingReply(destination, embed=embed)
+    await reply.start()
+    async for delta in groq_client.stream_chat_completion(messages, max_tokens=max_tokens):
+        await reply.feed(delta)
+    text = await reply.finish(fields=fields)
+    
+    if cache_key:
+        ai_cache.put(cache_key, text)
+    return text
+
 # ======= COMANDOS DE IA APRIMORADOS =======
 
-@bot.command(name='ask', aliases=['ai', 'chat'])
+@bot.hybrid_command(name='ask', aliases=['ai', 'chat'])
 async def ask_ai(ctx, *, question: str = None):
     """Faz uma pergunta para a IA com contexto dos containers"""
     if not groq_client:
@@ -747,38 +3111,33 @@ async def ask_ai(ctx, *, question: str = None):
         await ctx.send("❌ Faça uma pergunta: `!ask sua pergunta aqui`")
         return
     
-    async with ctx.typing():
-        # Obter contexto dos containers se a pergunta mencionar containers/recursos
-        context = ""
-        keywords = ['container', 'docker', 'cpu', 'ram', 'memoria', 'recurso', 'performance', 'deploy']
-        
-        if any(keyword in question.lower() for keyword in keywords):
-            containers = get_detailed_container_info()
-            if not isinstance(containers, str) and containers:
-                context = f"\n\nContexto atual dos containers:\n{json.dumps(containers, indent=2, default=str)}"
-        
-        messages = [
-            {
-                "role": "system", 
-                "content": f"Você é um assistente especializado em Docker, containers e monitoramento de sistemas. Responda de forma técnica mas acessível.{context}"
-            },
-            {
-                "role": "user", 
-                "content": question
-            }
-        ]
-        
-        response = await groq_client.chat_completion(messages, max_tokens=1500)
-        
-        # Dividir resposta se muito longa
-        if len(response) > 2000:
-            chunks = [response[i:i+1900] for i in range(0, len(response), 1900)]
-            for chunk in chunks:
-                await ctx.send(chunk)
-        else:
-            await ctx.send(response)
+    # Obter contexto dos containers se a pergunta mencionar containers/recursos
+    context = ""
+    fingerprint = None
+    keywords = ['container', 'docker', 'cpu', 'ram', 'memoria', 'recurso', 'performance', 'deploy']
+    
+    if any(keyword in question.lower() for keyword in keywords):
+        containers = await get_detailed_container_info()
+        if not isinstance(containers, str) and containers:
+            system_stats = get_system_stats()
+            context = f"\n\nContexto atual dos containers:\n{build_ai_context(containers, system_stats, question)}"
+            fingerprint = state_fingerprint(containers, system_stats)
+    
+    messages = [
+        {
+            "role": "system", 
+            "content": f"Você é um assistente especializado em Docker, containers e monitoramento de sistemas. Responda de forma técnica mas acessível.{context}"
+        },
+        {
+            "role": "user", 
+            "content": question
+        }
+    ]
+    
+    cache_key = ai_cache.key(GROQ_MODEL, 'ask', " ".join(question.lower().split()), fingerprint)
+    await stream_ai_reply(ctx, messages, max_tokens=1500, cache_key=cache_key)
 
-@bot.command(name='analyze')
+@bot.hybrid_command(name='analyze')
 async def analyze_system(ctx):
     """Análise completa do sistema com recursos"""
     if not groq_client:
@@ -787,56 +3146,51 @@ async def analyze_system(ctx):
     
     await ctx.send("🔍 Analisando sistema completo...")
     
-    containers = get_detailed_container_info()
+    containers = await get_detailed_container_info()
     system_stats = get_system_stats()
     
     if isinstance(containers, str):
         await ctx.send(containers)
         return
     
-    async with ctx.typing():
-        # Preparar dados para análise
-        analysis_data = {
-            "containers": containers,
-            "system": system_stats,
-            "summary": {
-                "total_containers": len(containers),
-                "running": len([c for c in containers if c['status'] == 'running']),
-                "stopped": len([c for c in containers if c['status'] != 'running']),
-                "total_cpu_usage": sum(c['stats']['cpu_percent'] for c in containers if c['status'] == 'running'),
-                "total_ram_usage_mb": sum(c['stats']['memory_usage_mb'] for c in containers if c['status'] == 'running')
-            }
+    # Preparar dados para análise
+    analysis_data = {
+        "summary": {
+            "total_containers": len(containers),
+            "running": len([c for c in containers if c['status'] == 'running']),
+            "stopped": len([c for c in containers if c['status'] != 'running']),
+            "total_cpu_usage": sum(c['stats']['cpu_percent'] for c in containers if c['status'] == 'running'),
+            "total_ram_usage_mb": sum(c['stats']['memory_usage_mb'] for c in containers if c['status'] == 'running')
         }
-        
-        messages = [
-            {
-                "role": "system",
-                "content": "Você é um especialista em análise de performance de sistemas Docker. Analise os dados e forneça insights sobre performance, problemas potenciais e recomendações."
-            },
-            {
-                "role": "user",
-                "content": f"Analise este sistema Docker completo com recursos: {json.dumps(analysis_data, indent=2, default=str)}. Foque em performance, saúde dos containers e recomendações."
-            }
-        ]
-        
-        response = await groq_client.chat_completion(messages, max_tokens=2000)
-        
-        embed = discord.Embed(
-            title="🔬 Análise Completa do Sistema",
-            description=response,
-            color=discord.Color.green() if analysis_data["summary"]["stopped"] == 0 else discord.Color.yellow(),
-            timestamp=datetime.now()
-        )
-        
-        embed.add_field(
-            name="Resumo Rápido",
-            value=f"🏃 {analysis_data['summary']['running']} rodando | ℹ️ {analysis_data['summary']['stopped']} parados\n🔥 CPU total: {analysis_data['summary']['total_cpu_usage']:.1f}% | 🧠 RAM total: {analysis_data['summary']['total_ram_usage_mb']:.0f} MB",
-            inline=False
-        )
-        
-        await ctx.send(embed=embed)
+    }
+    
+    messages = [
+        {
+            "role": "system",
+            "content": "Você é um especialista em análise de performance de sistemas Docker. Analise os dados e forneça insights sobre performance, problemas potenciais e recomendações."
+        },
+        {
+            "role": "user",
+            "content": f"Analise este sistema Docker completo com recursos:\n{build_ai_context(containers, system_stats)}\n\nFoque em performance, saúde dos containers e recomendações."
+        }
+    ]
+    
+    embed = discord.Embed(
+        title="🔬 Análise Completa do Sistema",
+        color=discord.Color.green() if analysis_data["summary"]["stopped"] == 0 else discord.Color.yellow(),
+        timestamp=datetime.now()
+    )
+    summary_field = (
+        "Resumo Rápido",
+        f"🏃 {analysis_data['summary']['running']} rodando | ℹ️ {analysis_data['summary']['stopped']} parados\n🔥 CPU total: {analysis_data['summary']['total_cpu_usage']:.1f}% | 🧠 RAM total: {analysis_data['summary']['total_ram_usage_mb']:.0f} MB",
+        False
+    )
+    
+    cache_key = ai_cache.key(GROQ_MODEL, messages[0]["content"], state_fingerprint(containers, system_stats))
+    await stream_ai_reply(ctx, messages, max_tokens=2000, embed=embed, fields=[summary_field], cache_key=cache_key)
 
-@bot.command(name='explain')
+@bot.hybrid_command(name='explain')
+@app_commands.autocomplete(container_name=container_autocomplete)
 async def explain_container(ctx, container_name: str = None):
     """Explica o que faz um container específico usando IA"""
     if not groq_client:
@@ -847,148 +3201,862 @@ async def explain_container(ctx, container_name: str = None):
         await ctx.send("❌ Especifique o nome do container: `!explain nome_do_container`")
         return
     
-    if not docker_client:
+    if not docker_hosts:
         await ctx.send("❌ Cliente Docker não disponível")
         return
     
     try:
-        container = docker_client.containers.get(container_name)
-        container_info = get_container_info(container)
-        stats = get_container_stats(container)
-        
-        async with ctx.typing():
-            messages = [
-                {
-                    "role": "system",
-                    "content": "Você é um especialista em Docker. Explique de forma didática o que faz um container baseado nas suas informações."
-                },
-                {
-                    "role": "user",
-                    "content": f"Explique o que faz este container: {json.dumps({**container_info, 'stats': stats}, indent=2, default=str)}"
-                }
-            ]
-            
-            response = await groq_client.chat_completion(messages, max_tokens=1000)
-            
-            embed = discord.Embed(
-                title=f"🔍 Análise do Container: {container_name}",
-                description=response,
-                color=discord.Color.green() if container.status == 'running' else discord.Color.red(),
-                timestamp=datetime.now()
-            )
-            
-            embed.add_field(
-                name="Status Atual",
-                value=f"Status: {container.status}\nCPU: {stats['cpu_percent']}%\nRAM: {stats['memory_usage_mb']} MB",
-                inline=False
-            )
-            
-            await ctx.send(embed=embed)
+        host, container = await find_container(container_name)
+        container_info = await host.docker.get_container_info(container)
+        stats = await host.docker.get_container_stats(container)
+        
+        messages = [
+            {
+                "role": "system",
+                "content": "Você é um especialista em Docker. Explique de forma didática o que faz um container baseado nas suas informações."
+            },
+            {
+                "role": "user",
+                "content": f"Explique o que faz este container: {json.dumps({**container_info, 'stats': stats}, indent=2, default=str)}"
+            }
+        ]
+        
+        embed = discord.Embed(
+            title=f"🔍 Análise do Container: {container_name}",
+            color=discord.Color.green() if container.status == 'running' else discord.Color.red(),
+            timestamp=datetime.now()
+        )
+        status_field = (
+            "Status Atual",
+            f"Status: {container.status}\nCPU: {stats['cpu_percent']}%\nRAM: {stats['memory_usage_mb']} MB",
+            False
+        )
+        
+        cache_key = ai_cache.key(GROQ_MODEL, messages[0]["content"], container_info['name'], container_info['image'], container_info['labels'],
+                                 container_info['ports'], stats_fingerprint(stats))
+        await stream_ai_reply(ctx, messages, max_tokens=1000, embed=embed, fields=[status_field], cache_key=cache_key)
             
     except docker.errors.NotFound:
         await ctx.send(f"❌ Container `{container_name}` não encontrado")
+    except asyncio.TimeoutError:
+        await ctx.send(f"⏰ Docker não respondeu a tempo para `{container_name}`")
     except Exception as e:
         await ctx.send(f"❌ Erro: {str(e)}")
 
 # ======= COMANDOS DE CONTROLE =======
 
-@bot.command(name='restart')
-async def restart_container(ctx, container_name: str = None):
-    """Reinicia um container específico"""
+COMPOSE_PROJECT_LABEL = 'com.docker.compose.project'
+COMPOSE_SERVICE_LABEL = 'com.docker.compose.service'
+COMPOSE_DEPENDS_LABEL = 'com.docker.compose.depends_on'
+
+# Ação em lote: (emoji, título, método do AsyncDocker, status em que o container é pulado)
+BULK_ACTIONS = {
+    'restart': ("🔄", "Reiniciando", 'restart_container', None),
+    'start': ("▶️", "Iniciando", 'start_container', 'running'),
+    'stop': ("⏹️", "Parando", 'stop_container', 'not_running')
+}
+
+def is_bulk_request(targets) -> bool:
+    return len(targets) > 1 or any(target.startswith('-') for target in targets)
+
+def select_containers(targets) -> Tuple[List[Tuple[DockerHost, str, dict]], List[str], bool]:
+    """Resolve nomes, `--project` e `--label chave[=valor]` pelo ContainerState
+
+    Retorna os containers selecionados, os nomes não encontrados e se
+    `--ordered` foi pedido.
+    """
+    names, labels, ordered = [], [], False
+    targets = list(targets)
+    while targets:
+        target = targets.pop(0)
+        if target == '--ordered':
+            ordered = True
+        elif target in ('--project', '-p', '--label', '-l'):
+            if not targets:
+                raise ValueError(f"`{target}` precisa de um valor")
+            value = targets.pop(0)
+            if target in ('--project', '-p'):
+                labels.append((COMPOSE_PROJECT_LABEL, value))
+            else:
+                key, sep, label_value = value.partition('=')
+                labels.append((key, label_value if sep else None))
+        elif target.startswith('-'):
+            raise ValueError(f"Opção inválida: `{target}`")
+        else:
+            names.append(target)
+    
+    selected: Dict[str, Tuple[DockerHost, str, dict]] = {}
+    missing = []
+    for name in names:
+        found = find_container_id(name)
+        if not found:
+            missing.append(name)
+            continue
+        host, container_id = found
+        selected[f"{host.name}/{container_id}"] = (host, container_id, host.state.containers[container_id])
+    
+    if labels:
+        for host in docker_hosts.values():
+            for container_id, info in list(host.state.containers.items()):
+                container_labels = info.get('labels') or {}
+                if all(key in container_labels and (value is None or container_labels[key] == value) for key, value in labels):
+                    selected[f"{host.name}/{container_id}"] = (host, container_id, info)
+    
+    return list(selected.values()), missing, ordered
+
+def dependency_levels(selected: List[Tuple[DockerHost, str, dict]]) -> List[list]:
+    """Agrupa os containers em níveis pelo depends_on do compose (dependências primeiro)
+
+    Só contam dependências entre containers da própria seleção; um ciclo vai
+    inteiro para o último nível.
+    """
+    def service_key(host, info, service):
+        return (host.name, (info.get('labels') or {}).get(COMPOSE_PROJECT_LABEL), service)
+    
+    services = {}
+    for item in selected:
+        host, _, info = item
+        service = (info.get('labels') or {}).get(COMPOSE_SERVICE_LABEL, info['name'])
+        services.setdefault(service_key(host, info, service), []).append(item)
+    
+    # "db:service_healthy:false,redis:service_started:true" -> {db, redis}
+    depends = {}
+    for key, items in services.items():
+        host, _, info = items[0]
+        spec = (info.get('labels') or {}).get(COMPOSE_DEPENDS_LABEL, '')
+        depends[key] = {service_key(host, info, entry.split(':')[0]) for entry in spec.split(',') if entry} & set(services)
+    
+    levels, placed = [], set()
+    while len(placed) < len(services):
+        ready = [key for key in services if key not in placed and depends[key] <= placed]
+        if not ready:
+            ready = [key for key in services if key not in placed]
+        levels.append([item for key in ready for item in services[key]])
+        placed.update(ready)
+    return levels
+
+class BulkProgress:
+    """Embed único de progresso de uma ação em lote, editado no máximo a cada STREAM_EDIT_INTERVAL"""
+    MAX_LINES = 40
+
+    def __init__(self, ctx, title: str, names: List[str], interval: float = STREAM_EDIT_INTERVAL):
+        self.ctx = ctx
+        self.title = title
+        self.interval = interval
+        self.states: Dict[str, Tuple[str, str]] = {name: ("⏳", "na fila") for name in names}
+        self.message = None
+        self.flush_task: Optional[asyncio.Task] = None
+        self.dirty = False
+        self.editing = False
+        self.last_edit = 0.0
+
+    def _embed(self, final: bool = False) -> discord.Embed:
+        done = sum(1 for emoji, _ in self.states.values() if emoji not in ("⏳", "🔄"))
+        failed = sum(1 for emoji, _ in self.states.values() if emoji in ("❌", "⏰"))
+        color = discord.Color.blue() if not final else (discord.Color.red() if failed else discord.Color.green())
+        lines = [f"{emoji} `{name}` {text}" for name, (emoji, text) in self.states.items()]
+        if len(lines) > self.MAX_LINES:
+            # Pendentes e falhas primeiro; concluídos com sucesso ficam só na contagem
+            lines = [line for line in lines if not line.startswith(("✅", "⏭️"))][:self.MAX_LINES]
+        embed = discord.Embed(title=self.title, description="\n".join(lines)[:4000], color=color, timestamp=datetime.now())
+        embed.set_footer(text=f"{done}/{len(self.states)} concluídos" + (f" • {failed} com erro" if failed else ""))
+        return embed
+
+    async def start(self):
+        self.message = await self.ctx.send(embed=self._embed())
+        self.last_edit = time.monotonic()
+
+    async def _flush_later(self):
+        # A task só é liberada depois do edit: finish() precisa saber se há um em andamento
+        try:
+            while self.dirty:
+                await asyncio.sleep(max(0.0, self.last_edit + self.interval - time.monotonic()))
+                self.dirty = False
+                self.editing = True
+                try:
+                    await self._edit()
+                finally:
+                    self.editing = False
+        finally:
+            self.flush_task = None
+
+    async def _edit(self, final: bool = False):
+        self.last_edit = time.monotonic()
+        try:
+            with perf.timer('discord', 'message.edit'):
+                await self.message.edit(embed=self._embed(final))
+        except discord.HTTPException as e:
+            logger.warning(f"Erro ao atualizar progresso: {e}")
+
+    def update(self, name: str, emoji: str, text: str):
+        self.states[name] = (emoji, text)
+        self.dirty = True
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_later())
+
+    async def finish(self):
+        # O edit final já inclui tudo; um edit em andamento termina antes dele
+        self.dirty = False
+        task = self.flush_task
+        if task:
+            if not self.editing:
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self._edit(final=True)
+
+async def run_bulk_action(ctx, action: str, targets):
+    """Executa restart/start/stop em vários containers com limite de concorrência"""
+    if not docker_hosts:
+        await ctx.send("❌ Cliente Docker não disponível")
+        return
+    
+    try:
+        selected, missing, ordered = select_containers(targets)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    
+    if missing:
+        await ctx.send(f"⚠️ Não encontrados: {', '.join(f'`{name}`' for name in missing)}")
+    if not selected:
+        await ctx.send("❌ Nenhum container selecionado")
+        return
+    
+    emoji, verb, method, skip_status = BULK_ACTIONS[action]
+    levels = dependency_levels(selected) if ordered else [selected]
+    if action == 'stop':
+        levels.reverse()  # Dependentes param antes das dependências
+    
+    title = f"{emoji} {verb} {len(selected)} containers" + (" (ordem de dependência)" if ordered else "")
+    progress = BulkProgress(ctx, title, [display_name(info) for _, _, info in selected])
+    await progress.start()
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+    
+    async def run_one(host: DockerHost, container_id: str, info: dict):
+        name = display_name(info)
+        async with semaphore:
+            progress.update(name, "🔄", "em andamento")
+            started = time.monotonic()
+            try:
+                container = await host.docker.get_container(container_id)
+                running = container.status == 'running'
+                if (skip_status == 'running' and running) or (skip_status == 'not_running' and not running):
+                    progress.update(name, "⏭️", "já rodando" if running else "já parado")
+                    return
+                await getattr(host.docker, method)(container)
+                progress.update(name, "✅", f"{time.monotonic() - started:.1f}s")
+            except docker.errors.NotFound:
+                progress.update(name, "❌", "não encontrado")
+            except asyncio.TimeoutError:
+                progress.update(name, "⏰", "Docker não respondeu a tempo")
+            except Exception as e:
+                progress.update(name, "❌", str(e)[:100])
+    
+    for level in levels:
+        await asyncio.gather(*(run_one(*item) for item in level))
+    await progress.finish()
+
+@bot.hybrid_command(name='restart')
+@app_commands.autocomplete(targets=targets_autocomplete)
+async def restart_container(ctx, *, targets: str = ''):
+    """Reinicia um container específico, ou vários por nome, label ou projeto do compose"""
+    targets = targets.split()
+    if is_bulk_request(targets):
+        await run_bulk_action(ctx, 'restart', targets)
+        return
+    
+    container_name = targets[0] if targets else None
     if not container_name:
         await ctx.send("❌ Especifique o nome do container: `!restart nome_do_container`")
         return
     
-    if not docker_client:
+    if not docker_hosts:
         await ctx.send("❌ Cliente Docker não disponível")
         return
     
     try:
-        container = docker_client.containers.get(container_name)
+        host, container = await find_container(container_name)
         await ctx.send(f"🔄 Reiniciando container `{container_name}`...")
         
-        container.restart()
+        await host.docker.restart_container(container)
         await ctx.send(f"✅ Container `{container_name}` reiniciado com sucesso!")
         
     except docker.errors.NotFound:
         await ctx.send(f"❌ Container `{container_name}` não encontrado")
+    except asyncio.TimeoutError:
+        await ctx.send(f"⏰ Docker não respondeu a tempo ao reiniciar `{container_name}`")
     except Exception as e:
         await ctx.send(f"❌ Erro ao reiniciar container: {str(e)}")
 
-@bot.command(name='start')
-async def start_container(ctx, container_name: str = None):
-    """Inicia um container específico"""
+@bot.hybrid_command(name='start')
+@app_commands.autocomplete(targets=targets_autocomplete)
+async def start_container(ctx, *, targets: str = ''):
+    """Inicia um container específico, ou vários por nome, label ou projeto do compose"""
+    targets = targets.split()
+    if is_bulk_request(targets):
+        await run_bulk_action(ctx, 'start', targets)
+        return
+    
+    container_name = targets[0] if targets else None
     if not container_name:
         await ctx.send("❌ Especifique o nome do container: `!start nome_do_container`")
         return
     
-    if not docker_client:
+    if not docker_hosts:
         await ctx.send("❌ Cliente Docker não disponível")
         return
     
     try:
-        container = docker_client.containers.get(container_name)
+        host, container = await find_container(container_name)
         
         if container.status == 'running':
             await ctx.send(f"ℹ️ Container `{container_name}` já está rodando")
             return
         
         await ctx.send(f"▶️ Iniciando container `{container_name}`...")
-        container.start()
+        await host.docker.start_container(container)
         await ctx.send(f"✅ Container `{container_name}` iniciado com sucesso!")
         
     except docker.errors.NotFound:
         await ctx.send(f"❌ Container `{container_name}` não encontrado")
+    except asyncio.TimeoutError:
+        await ctx.send(f"⏰ Docker não respondeu a tempo ao iniciar `{container_name}`")
     except Exception as e:
         await ctx.send(f"❌ Erro ao iniciar container: {str(e)}")
 
-@bot.command(name='stop')
-async def stop_container(ctx, container_name: str = None):
-    """Para um container específico"""
+@bot.hybrid_command(name='stop')
+@app_commands.autocomplete(targets=targets_autocomplete)
+async def stop_container(ctx, *, targets: str = ''):
+    """Para um container específico, ou vários por nome, label ou projeto do compose"""
+    targets = targets.split()
+    if is_bulk_request(targets):
+        await run_bulk_action(ctx, 'stop', targets)
+        return
+    
+    container_name = targets[0] if targets else None
     if not container_name:
         await ctx.send("❌ Especifique o nome do container: `!stop nome_do_container`")
         return
     
-    if not docker_client:
+    if not docker_hosts:
         await ctx.send("❌ Cliente Docker não disponível")
         return
     
     try:
-        container = docker_client.containers.get(container_name)
+        host, container = await find_container(container_name)
         
         if container.status != 'running':
             await ctx.send(f"ℹ️ Container `{container_name}` não está rodando")
             return
         
         await ctx.send(f"⏹️ Parando container `{container_name}`...")
-        container.stop()
+        await host.docker.stop_container(container)
         await ctx.send(f"✅ Container `{container_name}` parado com sucesso!")
         
     except docker.errors.NotFound:
         await ctx.send(f"❌ Container `{container_name}` não encontrado")
+    except asyncio.TimeoutError:
+        await ctx.send(f"⏰ Docker não respondeu a tempo ao parar `{container_name}`")
     except Exception as e:
         await ctx.send(f"❌ Erro ao parar container: {str(e)}")
 
+# ======= PAINEL INTERATIVO =======
+
+def dashboard_rows() -> List[dict]:
+    """Containers de todos os hosts com as stats em cache, sem chamadas ao Docker"""
+    rows = []
+    for host in docker_hosts.values():
+        for container_id, info in list(host.state.containers.items()):
+            stats = None
+            if host.stats_engine and info['status'] == 'running':
+                stats = host.stats_engine.get(container_id)
+            rows.append({
+                'name': display_name(info),
+                'status': info['status'],
+                'health': info.get('health'),
+                'project': (info.get('labels') or {}).get(COMPOSE_PROJECT_LABEL),
+                'flapping': container_id in host.state.flapping,
+                'stats': stats
+            })
+    return rows
+
+class Dashboard(discord.ui.View):
+    """Painel de containers paginado, com ordenação e filtro
+
+    Lê só o ContainerState e o cache de stats, e é editado no lugar a cada
+    DASHBOARD_REFRESH_INTERVAL; a edição é pulada quando o embed renderizado
+    não mudou.
+    """
+    SORTS = {
+        'cpu': ("CPU", lambda row: -(row['stats'] or {}).get('cpu_percent', -1)),
+        'mem': ("RAM", lambda row: -(row['stats'] or {}).get('memory_usage_mb', -1)),
+        'name': ("nome", lambda row: row['name'].lower())
+    }
+
+    def __init__(self, page_size: int = DASHBOARD_PAGE_SIZE):
+        super().__init__(timeout=None)
+        self.page_size = page_size
+        self.sort = 'cpu'
+        self.filter = 'all'
+        self.page = 0
+        self.pages = 1
+        self.message = None
+        self.last_rendered: Optional[str] = None
+
+    def _filtered(self, rows: List[dict]) -> List[dict]:
+        if self.filter == 'running':
+            return [row for row in rows if row['status'] == 'running']
+        if self.filter == 'stopped':
+            return [row for row in rows if row['status'] != 'running']
+        if self.filter.startswith('project:'):
+            return [row for row in rows if row['project'] == self.filter[len('project:'):]]
+        return rows
+
+    @staticmethod
+    def _line(row: dict) -> str:
+        if row['status'] != 'running':
+            return f"🔴 `{row['name']}` {row['status']}"
+        flags = (" ⚠️" if row['health'] == 'unhealthy' else "") + (" 🔁" if row['flapping'] else "")
+        stats = row['stats']
+        if not stats:
+            return f"🟢 `{row['name']}`{flags} —"
+        # Valores arredondados: oscilações pequenas não geram edição
+        return f"🟢 `{row['name']}`{flags} CPU {stats['cpu_percent']:.0f}% • RAM {stats['memory_usage_mb']:.0f} MB ({stats['memory_percent']:.0f}%)"
+
+    def render(self) -> discord.Embed:
+        rows = dashboard_rows()
+        projects = sorted({row['project'] for row in rows if row['project']})
+        selected = sorted(self._filtered(rows), key=self.SORTS[self.sort][1])
+        
+        self.pages = max(1, -(-len(selected) // self.page_size))
+        self.page = min(self.page, self.pages - 1)
+        page_rows = selected[self.page * self.page_size:(self.page + 1) * self.page_size]
+        
+        running = sum(1 for row in rows if row['status'] == 'running')
+        embed = discord.Embed(
+            title="📊 Painel de Containers",
+            description="\n".join(self._line(row) for row in page_rows)[:4096] or "🔭 Nenhum container neste filtro",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Resumo", value=f"✅ {running} rodando | 🔴 {len(rows) - running} parados | 📦 {len(rows)} total", inline=False)
+        filter_label = {'all': "todos", 'running': "rodando", 'stopped': "parados"}.get(self.filter, self.filter.partition(':')[2])
+        embed.set_footer(text=f"Página {self.page + 1}/{self.pages} • ordem: {self.SORTS[self.sort][0]} • filtro: {filter_label} • "
+                              f"atualiza a cada {format_age(DASHBOARD_REFRESH_INTERVAL)}")
+        
+        # Componentes acompanham o estado atual
+        self.filter_select.options = [
+            discord.SelectOption(label="Todos", value='all', default=self.filter == 'all'),
+            discord.SelectOption(label="Rodando", value='running', default=self.filter == 'running'),
+            discord.SelectOption(label="Parados", value='stopped', default=self.filter == 'stopped')
+        ] + [discord.SelectOption(label=f"Projeto: {project}"[:100], value=f"project:{project}"[:100],
+                                  default=self.filter == f"project:{project}") for project in projects[:22]]
+        for option in self.sort_select.options:
+            option.default = option.value == self.sort
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.pages - 1
+        return embed
+
+    async def _respond(self, interaction: discord.Interaction):
+        embed = self.render()
+        self.last_rendered = json.dumps(embed.to_dict(), sort_keys=True)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.select(placeholder="Ordenar por", row=0, options=[
+        discord.SelectOption(label="CPU", value='cpu', emoji="⚡"),
+        discord.SelectOption(label="RAM", value='mem', emoji="🧠"),
+        discord.SelectOption(label="Nome", value='name', emoji="🔤")
+    ])
+    async def sort_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        self.sort = select.values[0]
+        await self._respond(interaction)
+
+    @discord.ui.select(placeholder="Filtrar", row=1, options=[discord.SelectOption(label="Todos", value='all')])
+    async def filter_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        self.filter = select.values[0]
+        self.page = 0
+        await self._respond(interaction)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary, row=2)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await self._respond(interaction)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary, row=2)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        await self._respond(interaction)
+
+    @discord.ui.button(emoji="⏹️", label="Encerrar", style=discord.ButtonStyle.danger, row=2)
+    async def close_dashboard(self, interaction: discord.Interaction, button: discord.ui.Button):
+        dashboards.pop(self.message.id if self.message else None, None)
+        self.stop()
+        await interaction.response.edit_message(view=None)
+
+    async def refresh(self):
+        """Edita a mensagem com o estado atual, se algo visível mudou"""
+        embed = self.render()
+        rendered = json.dumps(embed.to_dict(), sort_keys=True)
+        if rendered == self.last_rendered:
+            return
+        await channel_rate_limiter.acquire(self.message.channel.id)
+        with perf.timer('discord', 'message.edit'):
+            await self.message.edit(embed=embed, view=self)
+        self.last_rendered = rendered
+
+# Painéis ativos, pelo id da mensagem
+dashboards: "OrderedDict[int, Dashboard]" = OrderedDict()
+
+@tasks.loop(seconds=DASHBOARD_REFRESH_INTERVAL)
+async def refresh_dashboards():
+    """Task que atualiza os painéis abertos a partir do estado em memória"""
+    for message_id, dashboard in list(dashboards.items()):
+        try:
+            await dashboard.refresh()
+        except discord.HTTPException as e:
+            if e.status == 429 or e.status >= 500:
+                logger.warning(f"Erro ao atualizar painel: {e}")
+                continue
+            # Mensagem apagada, sem permissão ou token inválido: não adianta tentar de novo
+            logger.info(f"Painel {message_id} encerrado: {e}")
+            dashboards.pop(message_id, None)
+            dashboard.stop()
+
+@bot.hybrid_command(name='dashboard', aliases=['painel'])
+async def dashboard(ctx):
+    """Abre um painel de containers paginado que se atualiza sozinho"""
+    if not docker_hosts:
+        await ctx.send("❌ Cliente Docker não disponível")
+        return
+    
+    view = Dashboard()
+    embed = view.render()
+    if ctx.interaction:
+        # Mensagens de follow-up são editadas com o token da interação, que expira em 15 min;
+        # o painel é postado no canal com o token do bot
+        view.message = await ctx.channel.send(embed=embed, view=view)
+        await ctx.send("📊 Painel aberto")
+    else:
+        view.message = await ctx.send(embed=embed, view=view)
+    view.last_rendered = json.dumps(embed.to_dict(), sort_keys=True)
+    dashboards[view.message.id] = view
+    
+    # Encerra os mais antigos para limitar as edições periódicas
+    while len(dashboards) > DASHBOARD_MAX:
+        _, oldest = dashboards.popitem(last=False)
+        oldest.stop()
+        try:
+            await oldest.message.edit(view=None)
+        except discord.HTTPException:
+            pass
+    
+    if not refresh_dashboards.is_running():
+        refresh_dashboards.start()
+
+# ======= LOGS DE CONTAINERS =======
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;?]*[ -/]*[@-~]')
+LOG_LINE_MAX = 1000
+
+class LogReader:
+    """Lê o stream de logs do Docker linha a linha com memória limitada
+
+    O filtro (--grep) é aplicado enquanto o stream chega; só as últimas
+    `max_lines` linhas aceitas (até LOGS_MAX_BYTES) ficam em memória, o resto
+    é descartado. A leitura para em LOGS_SCAN_LIMIT bytes ou LOGS_TIMEOUT.
+    """
+    def __init__(self, pattern: Optional[re.Pattern] = None, max_lines: int = LOGS_MAX_LINES,
+                 max_bytes: int = LOGS_MAX_BYTES, scan_limit: int = LOGS_SCAN_LIMIT, timeout: float = LOGS_TIMEOUT):
+        self.pattern = pattern
+        self.max_lines = min(max_lines, LOGS_MAX_LINES)
+        self.max_bytes = max_bytes
+        self.scan_limit = scan_limit
+        self.timeout = timeout
+        self.lines: deque = deque()
+        self.bytes = 0
+        self.matched = 0
+        self.scanned = 0
+        self.truncated = False
+
+    def _split(self, chunks):
+        """Remonta linhas a partir dos trechos do stream (um trecho pode ter várias linhas ou meia)"""
+        pending = b''
+        for chunk in chunks:
+            self.scanned += len(chunk)
+            pending += chunk
+            *lines, pending = pending.split(b'\n')
+            yield from lines
+            if len(pending) > LOG_LINE_MAX * 4:
+                yield pending
+                pending = b''
+        if pending:
+            yield pending
+
+    def accept(self, raw: bytes) -> Optional[str]:
+        """Linha pronta para exibição, ou None se não passa no filtro"""
+        line = ANSI_ESCAPE.sub('', raw.decode('utf-8', 'replace')).rstrip('\r')[:LOG_LINE_MAX]
+        if self.pattern and not self.pattern.search(line):
+            return None
+        return line
+
+    def _keep(self, line: str):
+        self.matched += 1
+        self.lines.append(line)
+        self.bytes += len(line) + 1
+        while len(self.lines) > self.max_lines or self.bytes > self.max_bytes:
+            self.bytes -= len(self.lines.popleft()) + 1
+
+    def read(self, stream) -> 'LogReader':
+        """Consome um stream sem follow até o fim (bloqueante: rodar fora do event loop)"""
+        deadline = time.monotonic() + self.timeout
+        try:
+            for raw in self._split(stream):
+                line = self.accept(raw)
+                if line is not None:
+                    self._keep(line)
+                if self.scanned > self.scan_limit or time.monotonic() > deadline:
+                    self.truncated = True
+                    break
+        finally:
+            stream.close()
+        return self
+
+    def pump(self, stream, window: 'LogWindow'):
+        """Thread do --follow: repassa linhas aceitas para a janela e marca o fim do stream"""
+        try:
+            for raw in self._split(stream):
+                line = self.accept(raw)
+                if line is not None:
+                    window.push(line)
+        except Exception as e:
+            logger.warning(f"Stream de logs interrompido: {e}")
+        finally:
+            window.end()
+
+class LogWindow:
+    """Linhas mais recentes do --follow, preenchidas pela thread do stream
+
+    A janela tem tamanho fixo e a thread só acorda o event loop quando há
+    novidade desde a última leitura: um container que escreve mais rápido do
+    que a mensagem é editada só faz as linhas mais antigas serem descartadas.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxlen: int = 60):
+        self.loop = loop
+        self.lines: deque = deque(maxlen=maxlen)
+        self.lock = threading.Lock()
+        self.received = 0
+        self.ended = False
+        self.notified = False
+        self.event = asyncio.Event()
+
+    def _wake(self):
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            pass  # Event loop já encerrado
+
+    def push(self, line: str):
+        with self.lock:
+            self.lines.append(line)
+            self.received += 1
+            if self.notified:
+                return
+            self.notified = True
+        self._wake()
+
+    def end(self):
+        with self.lock:
+            self.ended = True
+            self.notified = True
+        self._wake()
+
+    async def wait(self, timeout: float) -> bool:
+        """Espera novidade por até `timeout` segundos"""
+        try:
+            await asyncio.wait_for(self.event.wait(), max(0.0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def take(self) -> Tuple[List[str], int, bool]:
+        """Linhas atuais, total recebido e se o stream terminou; rearma o aviso"""
+        self.event.clear()
+        with self.lock:
+            self.notified = False
+            return list(self.lines), self.received, self.ended
+
+def parse_logs_options(text: str) -> dict:
+    """Interpreta `--since 10m --grep erro --tail 50 --follow [5m]`"""
+    options = {'since': None, 'grep': None, 'tail': None, 'follow': None}
+    args = shlex.split(text or '')
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else None
+        if arg in ('--follow', '-f'):
+            duration = parse_duration(value) if value and not value.startswith('-') else None
+            options['follow'] = min(duration or LOGS_FOLLOW_MAX, LOGS_FOLLOW_MAX)
+            i += 2 if duration else 1
+            continue
+        if arg not in ('--since', '--grep', '--tail') or value is None:
+            raise ValueError(f"Opção inválida: `{arg}`")
+        if arg == '--since':
+            seconds = parse_duration(value)
+            if not seconds:
+                raise ValueError(f"Período inválido: `{value}` (use 30m, 2h, 1d)")
+            options['since'] = int(time.time()) - seconds
+        elif arg == '--grep':
+            try:
+                options['grep'] = re.compile(value, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Expressão inválida em --grep: {e}")
+        else:
+            if not value.isdigit() or int(value) < 1:
+                raise ValueError(f"--tail precisa ser um número positivo: `{value}`")
+            options['tail'] = int(value)
+        i += 2
+    return options
+
+def log_pages(lines, limit: int = 1900) -> List[str]:
+    """Agrupa linhas em blocos de código que cabem em uma mensagem"""
+    pages, current, size = [], [], 0
+    for line in lines:
+        line = line.replace('```', '`\u200b``')
+        if current and size + len(line) + 1 > limit:
+            pages.append("```\n" + "\n".join(current) + "\n```")
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pages.append("```\n" + "\n".join(current) + "\n```")
+    return pages
+
+async def send_logs(ctx, name: str, reader: LogReader, options: dict):
+    """Envia as linhas lidas em mensagens ou, se forem muitas, como arquivo compactado"""
+    grep = options['grep']
+    if not reader.lines:
+        suffix = f" com `{grep.pattern}`" if grep else ""
+        await ctx.send(f"📭 Nenhuma linha de log{suffix} em `{name}`")
+        return
+    
+    header = f"📜 **Logs de `{name}`** — {len(reader.lines)} linhas"
+    if grep:
+        header += f" (de {reader.matched} com `{grep.pattern}`)"
+    if reader.truncated:
+        header += f"\n⚠️ Leitura interrompida após {reader.scanned / (1024 * 1024):.0f} MB; use `--since` para restringir"
+    
+    pages = log_pages(reader.lines)
+    if len(pages) <= LOGS_INLINE_PAGES:
+        await ctx.send(header)
+        for page in pages:
+            await ctx.send(page)
+        return
+    
+    text = "\n".join(reader.lines)
+    data = await asyncio.get_running_loop().run_in_executor(None, gzip.compress, text.encode())
+    filename = f"{name.replace('/', '_')}-logs.txt.gz"
+    await ctx.send(f"{header}\n📎 {len(pages)} páginas, enviadas como arquivo ({len(data) / 1024:.0f} KB)",
+                   file=discord.File(io.BytesIO(data), filename=filename))
+
+async def follow_logs(ctx, host: 'DockerHost', container, name: str, options: dict):
+    """Acompanha os logs ao vivo, editando uma mensagem com as linhas mais recentes"""
+    reader = LogReader(options['grep'])
+    loop = asyncio.get_running_loop()
+    window = LogWindow(loop)
+    tail = options['tail'] or 10
+    stream = await host.docker.run(container.logs, stream=True, follow=True, since=options['since'], tail=tail)
+    threading.Thread(target=reader.pump, args=(stream, window), name='docker-logs', daemon=True).start()
+    
+    title = f"📡 **Logs de `{name}` ao vivo** (até {format_age(options['follow'])})"
+    message = await ctx.send(f"{title}\n⏳ Aguardando linhas...")
+    deadline = loop.time() + options['follow']
+    lines, received, ended = [], 0, False
+    
+    def render(status: str = "") -> str:
+        # Só as linhas mais recentes que cabem em uma mensagem
+        page = log_pages(lines, limit=1800)[-1] if lines else "`(nenhuma linha)`"
+        return f"{title}{status}\n{page}"
+    
+    try:
+        next_edit = loop.time()
+        while not ended and await window.wait(deadline - loop.time()):
+            # No máximo uma edição por LOGS_FOLLOW_INTERVAL; o que chegar no meio entra na mesma
+            await asyncio.sleep(max(0.0, min(next_edit, deadline) - loop.time()))
+            lines, total, ended = window.take()
+            if total > received:
+                received = total
+                with perf.timer('discord', 'message.edit'):
+                    await message.edit(content=render())
+                next_edit = loop.time() + LOGS_FOLLOW_INTERVAL
+        # Estado final lido antes de fechar o stream (o fechamento também encerra a janela)
+        lines, _, ended = window.take()
+    finally:
+        stream.close()
+    
+    status = " — ⏹️ container parou" if ended else " — ⏹️ fim do acompanhamento"
+    with perf.timer('discord', 'message.edit'):
+        await message.edit(content=render(status))
+
+@bot.hybrid_command(name='logs')
+@app_commands.autocomplete(container_name=container_autocomplete)
+async def container_logs(ctx, container_name: str = None, *, options: str = ''):
+    """Mostra, filtra ou acompanha os logs de um container"""
+    if not container_name:
+        await ctx.send("❌ Uso: `!logs <container> [--since 30m] [--grep padrão] [--tail 100] [--follow [5m]]`")
+        return
+    
+    if not docker_hosts:
+        await ctx.send("❌ Cliente Docker não disponível")
+        return
+    
+    try:
+        parsed = parse_logs_options(options)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    
+    try:
+        host, container = await find_container(container_name)
+        
+        if parsed['follow']:
+            await follow_logs(ctx, host, container, container_name, parsed)
+            return
+        
+        # Com --grep o Docker envia tudo (ou desde --since) e o filtro guarda só as últimas ocorrências
+        reader = LogReader(parsed['grep'], max_lines=parsed['tail'] or LOGS_DEFAULT_TAIL)
+        tail = 'all' if parsed['grep'] else reader.max_lines
+        stream = await host.docker.run(container.logs, stream=True, follow=False, since=parsed['since'], tail=tail)
+        await host.docker.run(reader.read, stream, call_timeout=LOGS_TIMEOUT + host.docker.timeout)
+        await send_logs(ctx, container_name, reader, parsed)
+        
+    except docker.errors.NotFound:
+        await ctx.send(f"❌ Container `{container_name}` não encontrado")
+    except asyncio.TimeoutError:
+        await ctx.send(f"⏰ Docker não respondeu a tempo ao ler os logs de `{container_name}`")
+    except Exception as e:
+        await ctx.send(f"❌ Erro ao ler logs: {str(e)}")
+
 # ======= OUTROS COMANDOS =======
 
-@bot.command(name='ping')
+@bot.hybrid_command(name='ping')
 async def ping(ctx):
     """Testa se o bot está respondendo"""
     docker_status = "❌ Indisponível"
     groq_status = "❌ Indisponível"
     monitor_status = "❌ Inativo"
     
-    if docker_client:
-        try:
-            docker_client.ping()
-            docker_status = "✅ Conectado"
-        except:
-            docker_status = "❌ Erro"
+    if docker_hosts:
+        hosts = list(docker_hosts.values())
+        results = await asyncio.gather(*(host.docker.ping() for host in hosts), return_exceptions=True)
+        statuses = ["❌ Erro" if isinstance(result, Exception) else "✅ Conectado" for result in results]
+        if len(hosts) == 1:
+            docker_status = statuses[0]
+        else:
+            docker_status = "\n".join(f"{status} ({host.name})" for host, status in zip(hosts, statuses))
     
     if groq_client:
         groq_status = "✅ Conectado"
     
-    if monitor_containers.is_running():
+    if monitoring_active():
         monitor_status = "✅ Ativo"
     
     embed = discord.Embed(title="🏓 Pong!", color=discord.Color.green())
@@ -997,12 +4065,49 @@ async def ping(ctx):
     embed.add_field(name="Groq AI", value=groq_status, inline=True)
     embed.add_field(name="Monitoramento", value=monitor_status, inline=True)
     embed.add_field(name="Latência", value=f"{round(bot.latency * 1000)}ms", inline=True)
-    embed.add_field(name="Containers", value=len(container_state.containers), inline=True)
+    embed.add_field(name="Containers", value=monitored_container_count(), inline=True)
+    
+    await ctx.send(embed=embed)
+
+def format_latency(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 10 else f"{seconds:.0f}s"
+
+@bot.hybrid_command(name='perf')
+async def perf_stats(ctx, kind: str = None):
+    """Mostra p50/p95/p99 dos comandos e das chamadas a Docker, Groq, psutil e Discord"""
+    titles = {
+        'command': "⌨️ Comandos",
+        'docker': "🐳 Docker",
+        'groq': "🧠 Groq",
+        'psutil': "🖥️ psutil",
+        'discord': "💬 Discord",
+        'monitor': "📡 Monitoramento"
+    }
+    if kind and kind not in titles:
+        await ctx.send(f"❌ Categoria inválida. Use: {', '.join(titles)}")
+        return
+    
+    embed = discord.Embed(title="⏱️ Latências do Bot", color=discord.Color.blue(), timestamp=datetime.now())
+    for category, title in titles.items():
+        if kind and category != kind:
+            continue
+        entries = sorted(((name, histogram) for (k, name), histogram in perf.histograms.items() if k == category and histogram.total),
+                         key=lambda item: item[1].percentile(95), reverse=True)
+        if not entries:
+            continue
+        lines = [f"{'':<26} {'n':>5} {'p50':>6} {'p95':>6} {'p99':>6}"]
+        for name, histogram in entries[:12]:
+            lines.append(f"{name[:26]:<26} {histogram.total:>5} {format_latency(histogram.percentile(50)):>6} "
+                         f"{format_latency(histogram.percentile(95)):>6} {format_latency(histogram.percentile(99)):>6}")
+        embed.add_field(name=title, value="```\n" + "\n".join(lines)[:1000] + "\n```", inline=False)
+    
+    if not embed.fields:
+        embed.description = "Nenhuma medição ainda."
     
     await ctx.send(embed=embed)
 
 @bot.remove_command('help')
-@bot.command(name='help')
+@bot.hybrid_command(name='help')
 async def custom_help(ctx):
     """Mostra todos os comandos disponíveis"""
     embed = discord.Embed(
@@ -1013,25 +4118,25 @@ async def custom_help(ctx):
     
     embed.add_field(
         name="📊 Monitoramento Básico",
-        value="`!status` - Status geral dos containers\n`!ping` - Testa conexão do bot\n`!system` / `!host` - Info do sistema host",
+        value="`!status` - Status geral dos containers\n`!ping` - Testa conexão do bot\n`!dashboard` - Painel paginado que se atualiza sozinho\n`!system` / `!host` - Info do sistema host\n`!perf [categoria]` - Latências p50/p95/p99 do bot",
         inline=False
     )
     
     embed.add_field(
         name="📈 Monitoramento de Recursos",
-        value="`!resources [container]` - CPU, RAM, rede detalhados\n`!res` / `!stats` - Aliases para resources\n`!top [limite]` - Top consumidores de recursos",
+        value="`!resources [container]` - CPU, RAM, rede detalhados\n`!res` / `!stats` - Aliases para resources\n`!top [limite]` - Top consumidores de recursos\n`!history <container|host> [métrica] [período]` - Histórico de métricas\n`!trend <container> [período]` - Min/média/p95/máx recentes",
         inline=False
     )
     
     embed.add_field(
         name="🚀 Monitoramento de Deploy",
-        value="`!deploy_status` - Status do monitoramento\n`!recent_changes [minutos]` - Mudanças recentes\n`!set_deploy_channel [id]` - Configurar canal (admin)",
+        value="`!deploy_status` - Status do monitoramento\n`!recent_changes [minutos]` - Mudanças recentes\n`!set_deploy_channel [id]` - Configurar canal (admin)\n`!notifications [período]` - Histórico de notificações e alertas",
         inline=False
     )
     
     embed.add_field(
         name="🔧 Controle de Containers",
-        value="`!start <nome>` - Iniciar container\n`!stop <nome>` - Parar container\n`!restart <nome>` - Reiniciar container",
+        value="`!start <nome>` - Iniciar container\n`!stop <nome>` - Parar container\n`!restart <nome>` - Reiniciar container\n`!restart a b c` / `--project <p>` / `--label k=v` [`--ordered`] - Vários de uma vez\n`!logs <nome> [--since] [--grep] [--tail] [--follow]` - Logs do container",
         inline=False
     )
     
@@ -1064,14 +4169,14 @@ async def on_command_error(ctx, error):
 
 # ======= COMANDO DE LIMPEZA =======
 
-@bot.command(name='cleanup')
+@bot.hybrid_command(name='cleanup')
 async def cleanup_containers(ctx):
     """Remove containers parados (apenas administradores)"""
     if not ctx.author.guild_permissions.administrator:
         await ctx.send("❌ Apenas administradores podem executar limpeza de containers")
         return
     
-    if not docker_client:
+    if not docker_hosts:
         await ctx.send("❌ Cliente Docker não disponível")
         return
     
@@ -1099,10 +4204,10 @@ async def cleanup_containers(ctx):
             
             # Executar limpeza
             await ctx.send("🧹 Executando limpeza...")
-            result = docker_client.containers.prune()
+            results = await asyncio.gather(*(host.docker.prune_containers() for host in docker_hosts.values()))
             
-            removed_count = len(result.get('ContainersDeleted', []))
-            space_reclaimed = bytes_to_mb(result.get('SpaceReclaimed', 0))
+            removed_count = sum(len(result.get('ContainersDeleted') or []) for result in results)
+            space_reclaimed = bytes_to_mb(sum(result.get('SpaceReclaimed', 0) for result in results))
             
             embed = discord.Embed(
                 title="✅ Limpeza Concluída",
@@ -1127,7 +4232,7 @@ if __name__ == '__main__':
     if not GROQ_API_KEY:
         print("⚠️ GROQ_API_KEY não encontrado - funcionalidades IA desabilitadas")
     
-    if not DEPLOY_CHANNEL_ID:
+    if not DEPLOY_CHANNEL_ID and not state_store:
         print("⚠️ DEPLOY_CHANNEL_ID não configurado - notificações de deploy desabilitadas")
     
     print("🚀 Iniciando bot...")